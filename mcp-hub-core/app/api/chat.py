@@ -2,13 +2,48 @@
 Chat API endpoints
 """
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Header, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
+from collections import OrderedDict, deque
 from datetime import datetime
+from functools import lru_cache
+import asyncio
+import io
+import json
+import time
+
+from app.core.config import settings
+from app.core.database import get_db_version, get_mcp_metadata
+from app.services.llm_manager import llm_manager
+from app.services.mcp_executor import get_mcp_executor
+from app.services.nlp_tool_processor import nlp_processor
+
+# orjson is optional; when present it serializes tool results in C
+try:
+    import orjson
+    
+    def _dumps(obj: Any) -> str:
+        return orjson.dumps(obj, default=str).decode()
+except ImportError:
+    def _dumps(obj: Any) -> str:
+        return json.dumps(obj, separators=(',', ':'), default=str)
 
 router = APIRouter()
 
+# Tools without side effects, safe to run before the LLM has asked for them
+_SPECULATIVE_TOOLS = frozenset({
+    'list_tables', 'describe_table', 'get_table_data',
+    'read_file', 'list_directory',
+    'retrieve_memory', 'list_memories'
+})
+
+# Chat history per session, keyed by the client's X-Session-ID header. Each
+# session keeps only its most recent messages, and only the most recently
+# active sessions are kept, so memory stays bounded.
+_chat_histories: "OrderedDict[str, deque]" = OrderedDict()
+
 class ChatMessage(BaseModel):
     role: str
     content: str
@@ -19,6 +54,7 @@ class ChatRequest(BaseModel):
     provider: Optional[str] = "openai"
     max_tokens: Optional[int] = 2000
     temperature: Optional[float] = 0.3
+    force_refresh: Optional[bool] = False
 
 class ChatResponse(BaseModel):
     response: str
@@ -27,19 +63,14 @@ class ChatResponse(BaseModel):
     tokens_used: Optional[int] = None
     response_time: float
     timestamp: str
+    cached: bool = False
 
 @router.post("/", response_model=ChatResponse)
-async def send_message(request: ChatRequest):
+async def send_message(request: ChatRequest, session_id: Optional[str] = Header(None, alias="X-Session-ID")):
     """Send a chat message and get AI response with NLP tool integration"""
+    start_time = time.perf_counter()
     try:
-        # Import here to avoid circular imports
-        from app.services.llm_manager import LLMManager
-        from app.services.nlp_tool_processor import NLPToolProcessor
-        from app.services.mcp_executor import MCPExecutor
-        
-        llm_manager = LLMManager()
-        nlp_processor = NLPToolProcessor()
-        mcp_executor = MCPExecutor()
+        mcp_executor = get_mcp_executor()
         
         # First, try to process as a natural language tool command
         nlp_result = nlp_processor.process_query(request.message)
@@ -59,105 +90,183 @@ async def send_message(request: ChatRequest):
                     nlp_result['parameters']
                 )
                 
-                return ChatResponse(
+                chat_response = ChatResponse(
                     response=tool_response,
                     provider="nlp-tools",
                     model="natural-language-processor",
                     tokens_used=0,
-                    response_time=0.1,
+                    response_time=time.perf_counter() - start_time,
                     timestamp=datetime.now().isoformat()
                 )
+                _record_exchange(session_id, request.message, chat_response.response, chat_response.provider)
+                return chat_response
             except Exception as e:
                 # If tool execution fails, fall back to LLM
                 pass
         
-        # Fall back to LLM processing with enhanced system prompt
-        tools_info = get_tools_info()
-        resources_info = get_resources_info()
+        # A lower-confidence match on a read-only tool is likely what the LLM
+        # will ask for, so start it now and overlap it with the first LLM call
+        speculative = {}
+        if nlp_result['success'] and nlp_result['tool'] in _SPECULATIVE_TOOLS:
+            key = mcp_executor.tool_call_key(nlp_result['tool'], nlp_result['parameters'])
+            speculative[key] = asyncio.create_task(
+                mcp_executor.execute_tool(nlp_result['tool'], nlp_result['parameters'])
+            )
         
-        system_prompt = f"""You are a helpful AI assistant with access to MCP tools and resources.
-
-Available Tools: {tools_info}
-Available Resources: {resources_info}
-
-You can help users with:
-1. Natural language tool execution (e.g., "List database tables", "Show file contents")
-2. General questions and conversations
-3. Tool recommendations and guidance
-
-When a user asks something that can be answered using these tools, you should:
-1. Analyze the user's request
-2. Determine which tool(s) would be most helpful
-3. Execute the appropriate tool(s) with the right parameters
-4. Use the results to provide a comprehensive answer
-
-You can execute tools by responding with:
-TOOL_EXECUTE: {{"tool": "tool_name", "server": "server_name", "arguments": {{"param": "value"}}}}
-
-Always provide helpful, accurate responses based on the tool results."""
+        try:
+            # Fall back to LLM processing with enhanced system prompt
+            system_prompt = _system_prompt()
         
-        messages = [
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": request.message}
-        ]
+            messages = [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": request.message}
+            ]
         
-        start_time = datetime.now()
+            # Generate response with fallback logic
+            try:
+                response = await llm_manager.generate_response_async(
+                    messages,
+                    provider=request.provider,
+                    max_tokens=request.max_tokens,
+                    temperature=request.temperature,
+                    force_refresh=request.force_refresh
+                )
+            except Exception as e:
+                # If OpenAI fails and we're using OpenAI, try Google as fallback
+                if request.provider == "openai" and "quota" in str(e).lower():
+                    print(f"⚠️ OpenAI quota exceeded, falling back to Google: {e}")
+                    try:
+                        response = await llm_manager.generate_response_async(
+                            messages,
+                            provider="google",
+                            max_tokens=request.max_tokens,
+                            temperature=request.temperature,
+                            force_refresh=request.force_refresh
+                        )
+                    except Exception as fallback_error:
+                        print(f"⚠️ Google fallback also failed: {fallback_error}")
+                        raise e  # Re-raise original error
+                else:
+                    raise e
         
-        # Generate response with fallback logic
-        try:
-            response = await llm_manager.generate_response_async(
-                messages,
-                provider=request.provider,
-                max_tokens=request.max_tokens,
-                temperature=request.temperature
-            )
-        except Exception as e:
-            # If OpenAI fails and we're using OpenAI, try Google as fallback
-            if request.provider == "openai" and "quota" in str(e).lower():
-                print(f"⚠️ OpenAI quota exceeded, falling back to Google: {e}")
-                try:
+            # Run the tools the LLM asked for, reads concurrently, then let it answer from the results
+            if 'TOOL_EXECUTE:' in response.content:
+                tool_results = await mcp_executor.execute_tools_from_response(response.content, speculative)
+                if tool_results:
+                    messages.extend(_tool_results_messages(response.content, tool_results))
                     response = await llm_manager.generate_response_async(
                         messages,
-                        provider="google",
+                        provider=response.provider,
                         max_tokens=request.max_tokens,
-                        temperature=request.temperature
+                        temperature=request.temperature,
+                        force_refresh=request.force_refresh
                     )
-                except Exception as fallback_error:
-                    print(f"⚠️ Google fallback also failed: {fallback_error}")
-                    raise e  # Re-raise original error
-            else:
-                raise e
+        finally:
+            # Drop speculative work the LLM did not ask for, on every exit
+            # path, so no task is left running with nobody to collect it
+            _cancel_speculative(speculative)
         
-        end_time = datetime.now()
-        response_time = (end_time - start_time).total_seconds()
+        response_time = time.perf_counter() - start_time
         
-        return ChatResponse(
+        chat_response = ChatResponse(
             response=response.content,
             provider=response.provider,
             model=response.model,
             tokens_used=response.tokens_used,
             response_time=response_time,
-            timestamp=end_time.isoformat()
+            timestamp=datetime.now().isoformat(),
+            cached=response.cached
         )
+        _record_exchange(session_id, request.message, chat_response.response, chat_response.provider)
+        return chat_response
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to process chat message: {e}")
 
+@router.post("/stream")
+async def stream_message(request: ChatRequest, session_id: Optional[str] = Header(None, alias="X-Session-ID")):
+    """Send a chat message and stream the AI response as it is generated"""
+    try:
+        mcp_executor = get_mcp_executor()
+        llm_manager.get_provider_info(request.provider)
+        
+        messages = [
+            {"role": "system", "content": _system_prompt()},
+            {"role": "user", "content": request.message}
+        ]
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to process chat message: {e}")
+    
+    async def generate():
+        content = []
+        partial_line = ""
+        # Read-only tools started as soon as their TOOL_EXECUTE line is
+        # complete; execute_tools_from_response reuses their results
+        speculative = {}
+        
+        try:
+            async for delta in llm_manager.stream_response_async(
+                messages,
+                provider=request.provider,
+                max_tokens=request.max_tokens,
+                temperature=request.temperature
+            ):
+                content.append(delta)
+                yield delta
+                
+                # Start read-only tools as soon as their TOOL_EXECUTE line is
+                # complete rather than waiting for the whole response
+                lines = (partial_line + delta).split('\n')
+                partial_line = lines.pop()
+                for line in lines:
+                    if 'TOOL_EXECUTE:' in line:
+                        _start_speculative(mcp_executor, line, speculative)
+            
+            # All requests go through one call, so writes are ordered and
+            # batched as for a non-streamed reply
+            response_content = "".join(content)
+            tool_results = await mcp_executor.execute_tools_from_response(response_content, speculative)
+            if not tool_results:
+                _record_exchange(session_id, request.message, response_content, request.provider)
+                return
+            
+            messages.extend(_tool_results_messages(response_content, tool_results))
+            
+            yield "\n\n"
+            follow_up = []
+            async for delta in llm_manager.stream_response_async(
+                messages,
+                provider=request.provider,
+                max_tokens=request.max_tokens,
+                temperature=request.temperature
+            ):
+                follow_up.append(delta)
+                yield delta
+            
+            _record_exchange(session_id, request.message, "".join(follow_up), request.provider)
+        except Exception as e:
+            yield f"\n\nError: {e}"
+        finally:
+            # Also runs when the client disconnects mid-stream
+            _cancel_speculative(speculative)
+    
+    return StreamingResponse(generate(), media_type="text/plain")
+
 @router.get("/history")
-async def get_chat_history(limit: int = 50):
-    """Get chat history"""
+async def get_chat_history(limit: int = 50, session_id: Optional[str] = Header(None, alias="X-Session-ID")):
+    """Get the calling session's chat history"""
     try:
-        # This would typically come from a database
-        # For now, return empty history
-        return {"messages": []}
+        messages = list(_chat_histories.get(session_id, ())) if session_id else []
+        return {"messages": messages[-limit:] if limit > 0 else []}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get chat history: {e}")
 
 @router.delete("/history")
-async def clear_chat_history():
-    """Clear chat history"""
+async def clear_chat_history(session_id: Optional[str] = Header(None, alias="X-Session-ID")):
+    """Clear the calling session's chat history"""
     try:
-        # This would typically clear from a database
+        if session_id:
+            _chat_histories.pop(session_id, None)
         return {"message": "Chat history cleared"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to clear chat history: {e}")
@@ -170,9 +279,12 @@ def _format_tool_response_for_chat(tool: str, result: Dict[str, Any], parameters
     
     # Format response based on tool type
     if tool == 'list_directory':
-        files = result.get('result', {}).get('files', [])
+        files = result.get('result') or []
         if files:
-            file_list = '\n'.join([f"• {file}" for file in files[:10]])  # Show first 10 files
+            file_list = '\n'.join([
+                f"• {file['name']}/" if file['is_dir'] else f"• {file['name']}"
+                for file in files[:10]
+            ])  # Show first 10 files
             more_text = f"\n... and {len(files) - 10} more files" if len(files) > 10 else ""
             return f"Found {len(files)} files in {parameters.get('path', 'the directory')}:\n{file_list}{more_text}"
         else:
@@ -204,24 +316,32 @@ def _format_tool_response_for_chat(tool: str, result: Dict[str, Any], parameters
         if 'rows' in query_result:
             rows = query_result['rows']
             if rows:
-                # Show first few rows
-                display_rows = rows[:5]
-                response = f"Query executed successfully. Found {len(rows)} rows:\n"
-                for i, row in enumerate(display_rows):
-                    response += f"Row {i+1}: {row}\n"
-                if len(rows) > 5:
-                    response += f"... and {len(rows) - 5} more rows"
-                return response
+                table = _format_rows_table(query_result.get('columns', []), rows)
+                if query_result.get('truncated'):
+                    return (
+                        f"Query executed successfully. Showing first {len(rows)} rows; "
+                        f"the query matched more rows:\n{table}"
+                    )
+                return f"Query executed successfully. Found {len(rows)} rows:\n{table}"
             else:
                 return "Query executed successfully, but no rows were returned."
         else:
             return f"Query executed: {query_result.get('message', 'Success')}"
     
+    elif tool == 'get_table_data':
+        data = result.get('result', {})
+        rows = data['rows'] if 'rows' in data else list(zip(*data.get('columnar', [])))
+        if rows:
+            table = _format_rows_table(data.get('columns', []), rows)
+            return f"Sample data from {data.get('table', 'the table')}:\n{table}"
+        else:
+            return f"The table {data.get('table', '')} has no rows."
+    
     elif tool == 'describe_table':
         schema = result.get('result', {})
         if 'columns' in schema:
             columns = schema['columns']
-            column_list = '\n'.join([f"• {col['name']} ({col.get('type', 'unknown')})" for col in columns])
+            column_list = '\n'.join([f"• {col[0]} ({col[1] or 'unknown'})" for col in columns])
             return f"Table structure for {parameters.get('table_name', 'the table')}:\n{column_list}"
         else:
             return f"Table information: {schema.get('message', 'Success')}"
@@ -248,38 +368,132 @@ def _format_tool_response_for_chat(tool: str, result: Dict[str, Any], parameters
         # Generic response
         return f"Operation completed successfully. Result: {result.get('result', 'Success')}"
 
+def _format_rows_table(columns: List[str], rows: List[Any], max_rows: int = 5) -> str:
+    """Render the first rows of a result set as one markdown table"""
+    lines = [
+        f"| {' | '.join(map(str, columns))} |",
+        f"|{' --- |' * len(columns)}"
+    ]
+    lines.extend(f"| {' | '.join(map(str, row))} |" for row in rows[:max_rows])
+    if len(rows) > max_rows:
+        lines.append(f"... and {len(rows) - max_rows} more rows")
+    return "\n".join(lines)
+
+def _record_exchange(session_id: Optional[str], user_message: str, assistant_message: str, provider: str) -> None:
+    """Append a user message and its reply to the session's capped chat history
+    
+    Requests without a session id are not recorded, since nobody could
+    read their history back.
+    """
+    if not session_id:
+        return
+    history = _chat_histories.get(session_id)
+    if history is None:
+        history = _chat_histories[session_id] = deque(maxlen=settings.chat_history_max)
+        # Forget the least recently active session once there are too many
+        if len(_chat_histories) > settings.chat_sessions_max:
+            _chat_histories.popitem(last=False)
+    else:
+        _chat_histories.move_to_end(session_id)
+    timestamp = datetime.now().isoformat()
+    history.append({"role": "user", "content": user_message, "timestamp": timestamp})
+    history.append({"role": "assistant", "content": assistant_message, "timestamp": timestamp, "provider": provider})
+
+def _start_speculative(mcp_executor, text: str, speculative: Dict[str, "asyncio.Task"]) -> None:
+    """Start the side-effect-free tool calls requested in text, keyed for reuse"""
+    for tool_name, arguments in mcp_executor.parse_tool_requests(text):
+        if tool_name in _SPECULATIVE_TOOLS:
+            key = mcp_executor.tool_call_key(tool_name, arguments)
+            if key not in speculative:
+                speculative[key] = asyncio.create_task(mcp_executor.execute_tool(tool_name, arguments))
+
+def _cancel_speculative(speculative: Dict[Any, "asyncio.Task"]) -> None:
+    """Cancel speculative tool tasks still running and collect finished ones"""
+    for task in speculative.values():
+        if not task.done():
+            task.cancel()
+        elif not task.cancelled():
+            # Retrieve the exception so asyncio does not log it as never retrieved
+            task.exception()
+
+def _tool_results_messages(assistant_content: str, tool_results: List[Dict[str, Any]]) -> List[Dict[str, str]]:
+    """Build the follow-up turn that hands tool results back to the LLM"""
+    return [
+        {"role": "assistant", "content": assistant_content},
+        {"role": "user", "content": f"Tool results:\n{_dumps(tool_results)}\n\nUse these results to answer the original request."}
+    ]
+
+def _system_prompt() -> str:
+    """Get the chat system prompt, built once per database version"""
+    try:
+        return _build_system_prompt(get_db_version())
+    except Exception:
+        # Left uncached, so the next request retries; each section reports
+        # its own error
+        return _render_system_prompt(get_tools_info(), get_resources_info())
+
+@lru_cache(maxsize=1)
+def _build_system_prompt(db_version: Tuple[str, int]) -> str:
+    """Compose the chat system prompt once per database version
+    
+    Errors loading tools or resources propagate, so lru_cache never keeps a
+    prompt built from them.
+    """
+    return _render_system_prompt(_format_tools_info(db_version), _format_resources_info(db_version))
+
+def _render_system_prompt(tools_info: str, resources_info: str) -> str:
+    """Fill the chat system prompt template"""
+    return f"""You are a helpful AI assistant with access to MCP tools and resources.
+
+Available Tools: {tools_info}
+Available Resources: {resources_info}
+
+You can help users with:
+1. Natural language tool execution (e.g., "List database tables", "Show file contents")
+2. General questions and conversations
+3. Tool recommendations and guidance
+
+When a user asks something that can be answered using these tools, you should:
+1. Analyze the user's request
+2. Determine which tool(s) would be most helpful
+3. Execute the appropriate tool(s) with the right parameters
+4. Use the results to provide a comprehensive answer
+
+You can execute tools by responding with:
+TOOL_EXECUTE: {{"tool": "tool_name", "server": "server_name", "arguments": {{"param": "value"}}}}
+
+Always provide helpful, accurate responses based on the tool results."""
+
 def get_tools_info() -> str:
     """Get formatted tools information"""
     try:
-        import sqlite3
-        conn = sqlite3.connect('mcp.db')
-        cursor = conn.cursor()
-        cursor.execute("SELECT name, description FROM tools")
-        tools = cursor.fetchall()
-        conn.close()
-        
-        tools_info = []
-        for tool in tools:
-            tools_info.append(f"- {tool[0]}: {tool[1]}")
-        
-        return "\n".join(tools_info)
+        return _format_tools_info(get_db_version())
     except Exception as e:
         return f"Error loading tools: {e}"
 
 def get_resources_info() -> str:
     """Get formatted resources information"""
     try:
-        import sqlite3
-        conn = sqlite3.connect('mcp.db')
-        cursor = conn.cursor()
-        cursor.execute("SELECT name, uri FROM resources")
-        resources = cursor.fetchall()
-        conn.close()
-        
-        resources_info = []
-        for resource in resources:
-            resources_info.append(f"- {resource[0]}: {resource[1]}")
-        
-        return "\n".join(resources_info)
+        return _format_resources_info(get_db_version())
     except Exception as e:
         return f"Error loading resources: {e}"
+
+@lru_cache(maxsize=1)
+def _format_tools_info(db_version: Tuple[str, int]) -> str:
+    """Render the tool list once per database version"""
+    tools_info = io.StringIO()
+    for _, name, description, _, param_keys in get_mcp_metadata().tools:
+        tools_info.write(f"\n- {name}: {description}")
+        if param_keys:
+            tools_info.write(f"\n  Parameters: {', '.join(param_keys)}")
+    
+    return tools_info.getvalue()[1:]
+
+@lru_cache(maxsize=1)
+def _format_resources_info(db_version: Tuple[str, int]) -> str:
+    """Render the resource list once per database version"""
+    resources_info = io.StringIO()
+    for _, name, uri in get_mcp_metadata().resources:
+        resources_info.write(f"\n- {name}: {uri}")
+    
+    return resources_info.getvalue()[1:]
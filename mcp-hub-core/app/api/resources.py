@@ -5,7 +5,8 @@ Resources API endpoints
 from fastapi import APIRouter, HTTPException
 from typing import List, Dict, Any, Optional
 from pydantic import BaseModel
-import sqlite3
+
+from app.core.database import get_mcp_metadata, get_shared_connection
 
 router = APIRouter()
 
@@ -32,25 +33,21 @@ class ServerCreate(BaseModel):
 async def get_resources():
     """Get all available resources"""
     try:
-        conn = sqlite3.connect('mcp.db')
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT r.name, r.uri, s.name as server_name, s.enabled
-            FROM resources r
-            JOIN servers s ON r.server_name = s.name
-            ORDER BY s.name, r.name
-        """)
-        resources = cursor.fetchall()
-        conn.close()
-        
-        resources_list = []
-        for resource in resources:
-            resources_list.append({
-                "name": resource[0],
-                "uri": resource[1],
-                "server": resource[2],
-                "enabled": bool(resource[3])
-            })
+        # Served from the catalog snapshot, which is only re-read from SQLite
+        # after the database changes
+        metadata = get_mcp_metadata()
+        server_enabled = {name: enabled for name, _, enabled in metadata.servers}
+        
+        resources_list = [
+            {
+                "name": name,
+                "uri": uri,
+                "server": server_name,
+                "enabled": server_enabled[server_name]
+            }
+            for server_name, name, uri in metadata.resources
+            if server_name in server_enabled
+        ]
         
         return {"resources": resources_list}
     except Exception as e:
@@ -60,7 +57,7 @@ async def get_resources():
 async def get_resource(resource_name: str):
     """Get specific resource details"""
     try:
-        conn = sqlite3.connect('mcp.db')
+        conn = get_shared_connection()
         cursor = conn.cursor()
         cursor.execute("""
             SELECT r.name, r.uri, s.name as server_name, s.enabled
@@ -69,7 +66,6 @@ async def get_resource(resource_name: str):
             WHERE r.name = ?
         """, (resource_name,))
         resource = cursor.fetchone()
-        conn.close()
         
         if not resource:
             raise HTTPException(status_code=404, detail="Resource not found")
@@ -89,34 +85,30 @@ async def get_resource(resource_name: str):
 async def create_resource(resource: ResourceCreate):
     """Create a new resource"""
     try:
-        conn = sqlite3.connect('mcp.db')
-        cursor = conn.cursor()
-        
-        # Check if server exists
-        cursor.execute("SELECT id FROM servers WHERE name = ?", (resource.server_name,))
-        server = cursor.fetchone()
-        
-        if not server:
-            conn.close()
-            raise HTTPException(status_code=400, detail=f"Server '{resource.server_name}' not found")
-        
-        # Check if resource already exists
-        cursor.execute("SELECT id FROM resources WHERE name = ? AND server_name = ?", 
-                      (resource.name, resource.server_name))
-        existing = cursor.fetchone()
-        
-        if existing:
-            conn.close()
-            raise HTTPException(status_code=400, detail="Resource already exists")
-        
-        # Create resource
-        cursor.execute("""
-            INSERT INTO resources (name, uri, server_name)
-            VALUES (?, ?, ?)
-        """, (resource.name, resource.uri, resource.server_name))
-        
-        conn.commit()
-        conn.close()
+        conn = get_shared_connection()
+        with conn:
+            cursor = conn.cursor()
+            
+            # Check if server exists
+            cursor.execute("SELECT id FROM servers WHERE name = ?", (resource.server_name,))
+            server = cursor.fetchone()
+            
+            if not server:
+                raise HTTPException(status_code=400, detail=f"Server '{resource.server_name}' not found")
+            
+            # Check if resource already exists
+            cursor.execute("SELECT id FROM resources WHERE name = ? AND server_name = ?", 
+                          (resource.name, resource.server_name))
+            existing = cursor.fetchone()
+            
+            if existing:
+                raise HTTPException(status_code=400, detail="Resource already exists")
+            
+            # Create resource
+            cursor.execute("""
+                INSERT INTO resources (name, uri, server_name)
+                VALUES (?, ?, ?)
+            """, (resource.name, resource.uri, resource.server_name))
         
         return {"message": "Resource created successfully", "resource": resource.dict()}
     except HTTPException:
@@ -128,47 +120,43 @@ async def create_resource(resource: ResourceCreate):
 async def update_resource(resource_name: str, resource: ResourceUpdate):
     """Update a resource"""
     try:
-        conn = sqlite3.connect('mcp.db')
-        cursor = conn.cursor()
-        
-        # Check if resource exists
-        cursor.execute("SELECT id FROM resources WHERE name = ?", (resource_name,))
-        existing = cursor.fetchone()
-        
-        if not existing:
-            conn.close()
-            raise HTTPException(status_code=404, detail="Resource not found")
-        
-        # Build update query dynamically
-        update_fields = []
-        values = []
-        
-        if resource.name is not None:
-            update_fields.append("name = ?")
-            values.append(resource.name)
-        if resource.uri is not None:
-            update_fields.append("uri = ?")
-            values.append(resource.uri)
-        if resource.server_name is not None:
-            # Check if new server exists
-            cursor.execute("SELECT id FROM servers WHERE name = ?", (resource.server_name,))
-            server = cursor.fetchone()
-            if not server:
-                conn.close()
-                raise HTTPException(status_code=400, detail=f"Server '{resource.server_name}' not found")
-            update_fields.append("server_name = ?")
-            values.append(resource.server_name)
-        
-        if not update_fields:
-            conn.close()
-            raise HTTPException(status_code=400, detail="No fields to update")
-        
-        values.append(resource_name)
-        query = f"UPDATE resources SET {', '.join(update_fields)} WHERE name = ?"
-        
-        cursor.execute(query, values)
-        conn.commit()
-        conn.close()
+        conn = get_shared_connection()
+        with conn:
+            cursor = conn.cursor()
+            
+            # Check if resource exists
+            cursor.execute("SELECT id FROM resources WHERE name = ?", (resource_name,))
+            existing = cursor.fetchone()
+            
+            if not existing:
+                raise HTTPException(status_code=404, detail="Resource not found")
+            
+            # Build update query dynamically
+            update_fields = []
+            values = []
+            
+            if resource.name is not None:
+                update_fields.append("name = ?")
+                values.append(resource.name)
+            if resource.uri is not None:
+                update_fields.append("uri = ?")
+                values.append(resource.uri)
+            if resource.server_name is not None:
+                # Check if new server exists
+                cursor.execute("SELECT id FROM servers WHERE name = ?", (resource.server_name,))
+                server = cursor.fetchone()
+                if not server:
+                    raise HTTPException(status_code=400, detail=f"Server '{resource.server_name}' not found")
+                update_fields.append("server_name = ?")
+                values.append(resource.server_name)
+            
+            if not update_fields:
+                raise HTTPException(status_code=400, detail="No fields to update")
+            
+            values.append(resource_name)
+            query = f"UPDATE resources SET {', '.join(update_fields)} WHERE name = ?"
+            
+            cursor.execute(query, values)
         
         return {"message": "Resource updated successfully"}
     except HTTPException:
@@ -180,21 +168,19 @@ async def update_resource(resource_name: str, resource: ResourceUpdate):
 async def delete_resource(resource_name: str):
     """Delete a resource"""
     try:
-        conn = sqlite3.connect('mcp.db')
-        cursor = conn.cursor()
-        
-        # Check if resource exists
-        cursor.execute("SELECT id FROM resources WHERE name = ?", (resource_name,))
-        existing = cursor.fetchone()
-        
-        if not existing:
-            conn.close()
-            raise HTTPException(status_code=404, detail="Resource not found")
-        
-        # Delete resource
-        cursor.execute("DELETE FROM resources WHERE name = ?", (resource_name,))
-        conn.commit()
-        conn.close()
+        conn = get_shared_connection()
+        with conn:
+            cursor = conn.cursor()
+            
+            # Check if resource exists
+            cursor.execute("SELECT id FROM resources WHERE name = ?", (resource_name,))
+            existing = cursor.fetchone()
+            
+            if not existing:
+                raise HTTPException(status_code=404, detail="Resource not found")
+            
+            # Delete resource
+            cursor.execute("DELETE FROM resources WHERE name = ?", (resource_name,))
         
         return {"message": "Resource deleted successfully"}
     except HTTPException:
@@ -206,19 +192,10 @@ async def delete_resource(resource_name: str):
 async def get_servers():
     """Get all servers"""
     try:
-        conn = sqlite3.connect('mcp.db')
-        cursor = conn.cursor()
-        cursor.execute("SELECT name, uri, enabled FROM servers ORDER BY name")
-        servers = cursor.fetchall()
-        conn.close()
-        
-        servers_list = []
-        for server in servers:
-            servers_list.append({
-                "name": server[0],
-                "uri": server[1],
-                "enabled": bool(server[2])
-            })
+        servers_list = [
+            {"name": name, "uri": uri, "enabled": enabled}
+            for name, uri, enabled in get_mcp_metadata().servers
+        ]
         
         return {"servers": servers_list}
     except Exception as e:
@@ -228,25 +205,22 @@ async def get_servers():
 async def create_server(server: ServerCreate):
     """Create a new server"""
     try:
-        conn = sqlite3.connect('mcp.db')
-        cursor = conn.cursor()
-        
-        # Check if server already exists
-        cursor.execute("SELECT id FROM servers WHERE name = ?", (server.name,))
-        existing = cursor.fetchone()
-        
-        if existing:
-            conn.close()
-            raise HTTPException(status_code=400, detail="Server already exists")
-        
-        # Create server
-        cursor.execute("""
-            INSERT INTO servers (name, uri, enabled)
-            VALUES (?, ?, ?)
-        """, (server.name, server.uri, server.enabled))
-        
-        conn.commit()
-        conn.close()
+        conn = get_shared_connection()
+        with conn:
+            cursor = conn.cursor()
+            
+            # Check if server already exists
+            cursor.execute("SELECT id FROM servers WHERE name = ?", (server.name,))
+            existing = cursor.fetchone()
+            
+            if existing:
+                raise HTTPException(status_code=400, detail="Server already exists")
+            
+            # Create server
+            cursor.execute("""
+                INSERT INTO servers (name, uri, enabled)
+                VALUES (?, ?, ?)
+            """, (server.name, server.uri, server.enabled))
         
         return {"message": "Server created successfully", "server": server.dict()}
     except HTTPException:
@@ -258,24 +232,22 @@ async def create_server(server: ServerCreate):
 async def delete_server(server_name: str):
     """Delete a server and its resources"""
     try:
-        conn = sqlite3.connect('mcp.db')
-        cursor = conn.cursor()
-        
-        # Check if server exists
-        cursor.execute("SELECT id FROM servers WHERE name = ?", (server_name,))
-        existing = cursor.fetchone()
-        
-        if not existing:
-            conn.close()
-            raise HTTPException(status_code=404, detail="Server not found")
-        
-        # Delete associated resources first
-        cursor.execute("DELETE FROM resources WHERE server_name = ?", (server_name,))
-        
-        # Delete server
-        cursor.execute("DELETE FROM servers WHERE name = ?", (server_name,))
-        conn.commit()
-        conn.close()
+        conn = get_shared_connection()
+        with conn:
+            cursor = conn.cursor()
+            
+            # Check if server exists
+            cursor.execute("SELECT id FROM servers WHERE name = ?", (server_name,))
+            existing = cursor.fetchone()
+            
+            if not existing:
+                raise HTTPException(status_code=404, detail="Server not found")
+            
+            # Delete associated resources first
+            cursor.execute("DELETE FROM resources WHERE server_name = ?", (server_name,))
+            
+            # Delete server
+            cursor.execute("DELETE FROM servers WHERE name = ?", (server_name,))
         
         return {"message": "Server and associated resources deleted successfully"}
     except HTTPException:
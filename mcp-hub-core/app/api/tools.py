@@ -4,8 +4,10 @@ Tools API endpoints
 
 from fastapi import APIRouter, HTTPException, Depends
 from typing import List, Dict, Any, Optional
-import sqlite3
-import json
+from datetime import datetime
+
+from app.core.database import get_mcp_metadata, get_shared_connection
+from app.services.mcp_executor import get_mcp_executor
 
 router = APIRouter()
 
@@ -13,35 +15,30 @@ router = APIRouter()
 async def get_tools():
     """Get all available tools grouped by server/resource"""
     try:
-        conn = sqlite3.connect('mcp.db')
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT t.name, t.description, t.parameters, s.name as server_name, s.enabled, s.uri
-            FROM tools t
-            JOIN servers s ON t.server_name = s.name
-            ORDER BY s.name, t.name
-        """)
-        tools = cursor.fetchall()
-        conn.close()
+        metadata = get_mcp_metadata()
         
-        # Group tools by server/resource
+        # Tools are indexed by server once per catalog version, so each
+        # server's group is a dict lookup rather than a scan of every tool
         grouped_tools = {}
-        for tool in tools:
-            server_name = tool[3]
-            if server_name not in grouped_tools:
-                grouped_tools[server_name] = {
-                    "server": server_name,
-                    "uri": tool[5],
-                    "enabled": bool(tool[4]),
-                    "tools": []
-                }
+        for server_name, uri, enabled in metadata.servers:
+            server_tools = metadata.tools_by_server.get(server_name)
+            if not server_tools:
+                continue
             
-            grouped_tools[server_name]["tools"].append({
-                "name": tool[0],
-                "description": tool[1],
-                "parameters": json.loads(tool[2]) if tool[2] else {},
-                "enabled": bool(tool[4])
-            })
+            grouped_tools[server_name] = {
+                "server": server_name,
+                "uri": uri,
+                "enabled": enabled,
+                "tools": [
+                    {
+                        "name": tool[1],
+                        "description": tool[2],
+                        "parameters": tool[3],
+                        "enabled": enabled
+                    }
+                    for tool in server_tools
+                ]
+            }
         
         # Convert to list format
         servers_list = list(grouped_tools.values())
@@ -58,26 +55,19 @@ async def get_tools():
 async def get_tool(tool_name: str):
     """Get specific tool details"""
     try:
-        conn = sqlite3.connect('mcp.db')
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT t.name, t.description, t.parameters, s.name as server_name, s.enabled
-            FROM tools t
-            JOIN servers s ON t.server_name = s.name
-            WHERE t.name = ?
-        """, (tool_name,))
-        tool = cursor.fetchone()
-        conn.close()
+        metadata = get_mcp_metadata()
+        tool = metadata.tools_by_name.get(tool_name)
+        server_enabled = {name: enabled for name, _, enabled in metadata.servers}
         
-        if not tool:
+        if not tool or tool[0] not in server_enabled:
             raise HTTPException(status_code=404, detail="Tool not found")
         
         return {
-            "name": tool[0],
-            "description": tool[1],
-            "parameters": json.loads(tool[2]) if tool[2] else {},
-            "server": tool[3],
-            "enabled": bool(tool[4])
+            "name": tool[1],
+            "description": tool[2],
+            "parameters": tool[3],
+            "server": tool[0],
+            "enabled": server_enabled[tool[0]]
         }
     except HTTPException:
         raise
@@ -88,10 +78,7 @@ async def get_tool(tool_name: str):
 async def execute_tool(tool_name: str, arguments: Dict[str, Any]):
     """Execute a tool with given arguments"""
     try:
-        # Import here to avoid circular imports
-        from app.services.mcp_executor import MCPExecutor
-        
-        executor = MCPExecutor()
+        executor = get_mcp_executor()
         result = await executor.execute_tool(tool_name, arguments)
         
         return {
@@ -114,19 +101,10 @@ async def execute_tool(tool_name: str, arguments: Dict[str, Any]):
 async def get_servers():
     """Get all MCP servers"""
     try:
-        conn = sqlite3.connect('mcp.db')
-        cursor = conn.cursor()
-        cursor.execute("SELECT name, uri, enabled FROM servers ORDER BY name")
-        servers = cursor.fetchall()
-        conn.close()
-        
-        servers_list = []
-        for server in servers:
-            servers_list.append({
-                "name": server[0],
-                "uri": server[1],
-                "enabled": bool(server[2])
-            })
+        servers_list = [
+            {"name": name, "uri": uri, "enabled": enabled}
+            for name, uri, enabled in get_mcp_metadata().servers
+        ]
         
         return {"servers": servers_list}
     except Exception as e:
@@ -136,14 +114,12 @@ async def get_servers():
 async def toggle_server(server_name: str, enabled: bool):
     """Enable/disable a server"""
     try:
-        conn = sqlite3.connect('mcp.db')
-        cursor = conn.cursor()
-        cursor.execute(
-            "UPDATE servers SET enabled = ? WHERE name = ?",
-            (enabled, server_name)
-        )
-        conn.commit()
-        conn.close()
+        conn = get_shared_connection()
+        with conn:
+            conn.execute(
+                "UPDATE servers SET enabled = ? WHERE name = ?",
+                (enabled, server_name)
+            )
         
         return {
             "server": server_name,
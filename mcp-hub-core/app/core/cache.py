@@ -2,6 +2,7 @@
 Caching system for MCP Hub Core with Redis and in-memory fallback
 """
 
+import fnmatch
 import json
 import time
 import hashlib
@@ -115,7 +116,6 @@ class InMemoryCache:
                 return list(self._cache.keys())
             
             # Simple pattern matching
-            import fnmatch
             return [key for key in self._cache.keys() if fnmatch.fnmatch(key, pattern)]
     
     def size(self) -> int:
@@ -410,6 +410,14 @@ class CacheUtils:
             return wrapper
         return decorator
     
+    @staticmethod
+    def llm_response_key(provider: str, model: str, messages: List[Dict[str, str]],
+                         temperature: float, max_tokens: int) -> str:
+        """Build a cache key covering everything that determines an LLM response"""
+        canonical = json.dumps([provider, model, temperature, max_tokens, messages],
+                               sort_keys=True, separators=(',', ':'))
+        return f"llm:response:{hashlib.blake2b(canonical.encode(), digest_size=16).hexdigest()}"
+    
     @staticmethod
     def invalidate_tools_cache():
         """Invalidate tools-related cache"""
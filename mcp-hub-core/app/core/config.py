@@ -29,6 +29,10 @@ class Settings(BaseSettings):
     secret_key: str = "your-secret-key-change-in-production"
     access_token_expire_minutes: int = 30
     
+    # Chat
+    chat_history_max: int = 50
+    chat_sessions_max: int = 1000
+    
     # WebSocket
     websocket_ping_interval: int = 25
     websocket_ping_timeout: int = 60
@@ -1,12 +1,44 @@
 """Database initialization and management for MCP Hub Core."""
 
+import json
 import os
 import sqlite3
+import threading
 from contextlib import closing
-from typing import Any, Dict, List
+from dataclasses import dataclass
+from functools import lru_cache
+from itertools import groupby
+from operator import itemgetter
+from typing import Any, Dict, List, Sequence, Tuple
 
 DB_PATH = os.getenv("MCP_DB_PATH", "mcp.db")
 
+# SQLite's default SQLITE_MAX_VARIABLE_NUMBER on older builds
+SQLITE_MAX_VARIABLES = 999
+
+# Per-connection prepared statement cache size (the sqlite3 default is 128)
+SQLITE_CACHED_STATEMENTS = 256
+
+# Applied to every connection open_connection() makes. WAL with
+# synchronous=NORMAL turns a commit into a single WAL append with no fsync,
+# and lets reads run alongside a write; the page cache is 20 MB instead of
+# the 2 MB default. Lock waits come from sqlite3.connect's own timeout.
+SQLITE_CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA wal_autocheckpoint=1000",
+    "PRAGMA cache_size=-20000",
+)
+
+# Per-thread shared connections, keyed by database path
+_thread_local = threading.local()
+
+# Read-only connections that get_db_version() asks for PRAGMA data_version,
+# one per database path, shared by all threads
+_version_connections: Dict[str, sqlite3.Connection] = {}
+_version_lock = threading.Lock()
+
 
 def _ensure_db_directory(path: str) -> None:
     """Ensure the directory for the SQLite database exists."""
@@ -22,13 +54,105 @@ def _get_sqlite_uri(path: str) -> str:
     return f"sqlite:///{os.path.abspath(path)}"
 
 
+# Static seed catalog, built once at import and shared by every init_db() call
+DEFAULT_SERVERS = (
+    ("sqlite", _get_sqlite_uri(DB_PATH), 1),
+    ("filesystem", "file:///", 1),
+    ("memory", "memory://", 1),
+)
+
+DEFAULT_TOOLS = (
+    (
+        "sqlite",
+        "query_database",
+        "Execute SQL queries on the database",
+        '{"query": {"type": "string", "required": true}, "limit": {"type": "integer", "default": 100}}',
+    ),
+    ("sqlite", "list_tables", "List all tables in the database", "{}"),
+    ("sqlite", "describe_table", "Get table schema information", '{"table_name": {"type": "string", "required": true}}'),
+    (
+        "sqlite",
+        "get_table_data",
+        "Get sample data from a table",
+        '{"table_name": {"type": "string", "required": true}, "limit": {"type": "integer", "default": 10}, '
+        '"columns": {"type": "array", "items": {"type": "string"}}, '
+        '"layout": {"type": "string", "enum": ["rows", "columnar"], "default": "rows"}}',
+    ),
+    (
+        "filesystem",
+        "read_file",
+        "Read contents of a file",
+        '{"path": {"type": "string", "required": true}, "offset": {"type": "integer", "default": 0}, '
+        '"max_bytes": {"type": "integer", "default": 1048576}}',
+    ),
+    (
+        "filesystem",
+        "write_file",
+        "Write content to a file",
+        '{"path": {"type": "string", "required": true}, "content": {"type": "string", "required": true}}',
+    ),
+    ("filesystem", "list_directory", "List files and directories", '{"path": {"type": "string", "required": true}}'),
+    (
+        "memory",
+        "store_memory",
+        "Store information in memory",
+        '{"key": {"type": "string", "required": true}, "value": {"type": "string", "required": true}}',
+    ),
+    ("memory", "retrieve_memory", "Retrieve information from memory", '{"key": {"type": "string", "required": true}}'),
+    ("memory", "list_memories", "List all stored memories", '{"limit": {"type": "integer"}}'),
+)
+
+DEFAULT_RESOURCES = (
+    ("sqlite", "mcp_database", _get_sqlite_uri(DB_PATH)),
+    ("filesystem", "file_system", "/"),
+    ("memory", "memory_store", "memory://"),
+)
+
+
+def _insert_rows(
+    cursor: sqlite3.Cursor,
+    table: str,
+    columns: Sequence[str],
+    rows: Sequence[tuple],
+    conflict: str = "IGNORE",
+) -> None:
+    """Insert rows with multi-row VALUES statements, chunked to the bound-variable limit."""
+
+    if not rows:
+        return
+
+    row_placeholder = f"({', '.join('?' * len(columns))})"
+    chunk_size = max(1, SQLITE_MAX_VARIABLES // len(columns))
+
+    for start in range(0, len(rows), chunk_size):
+        chunk = rows[start:start + chunk_size]
+        placeholders = ", ".join([row_placeholder] * len(chunk))
+        params = [value for row in chunk for value in row]
+        cursor.execute(
+            f"INSERT OR {conflict} INTO {table} ({', '.join(columns)}) VALUES {placeholders}",
+            params,
+        )
+
+
 def init_db() -> None:
     """Initialize the MCP database with required tables."""
 
     try:
         _ensure_db_directory(DB_PATH)
 
-        with closing(sqlite3.connect(DB_PATH)) as conn, closing(conn.cursor()) as cursor:
+        # isolation_level=None disables the sqlite3 module's implicit transaction
+        # handling so the explicit BEGIN IMMEDIATE below is the only one.
+        with closing(sqlite3.connect(DB_PATH, isolation_level=None)) as conn, conn, closing(conn.cursor()) as cursor:
+            # WAL persists in the database file, so every later connection
+            # avoids the rollback-journal fsync on commit.
+            cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute("PRAGMA synchronous=NORMAL")
+            cursor.execute("PRAGMA temp_store=MEMORY")
+
+            # Create the schema and seed defaults in a single write transaction;
+            # the connection context manager commits or rolls back on exit.
+            cursor.execute("BEGIN IMMEDIATE")
+
             # Create servers table
             cursor.execute('''
                 CREATE TABLE IF NOT EXISTS servers (
@@ -67,68 +191,10 @@ def init_db() -> None:
                 )
             ''')
 
-            # Insert default servers if they don't exist
-            default_servers = [
-                ("sqlite", _get_sqlite_uri(DB_PATH), 1),
-                ("filesystem", "file:///", 1),
-                ("memory", "memory://", 1),
-            ]
-
-            for server in default_servers:
-                cursor.execute('''
-                    INSERT OR IGNORE INTO servers (name, uri, enabled)
-                    VALUES (?, ?, ?)
-                ''', server)
-
-            # Insert default tools
-            default_tools = [
-                ("sqlite", "query_database", "Execute SQL queries on the database", '{"query": {"type": "string", "required": true}}'),
-                ("sqlite", "list_tables", "List all tables in the database", "{}"),
-                ("sqlite", "describe_table", "Get table schema information", '{"table_name": {"type": "string", "required": true}}'),
-                (
-                    "sqlite",
-                    "get_table_data",
-                    "Get sample data from a table",
-                    '{"table_name": {"type": "string", "required": true}, "limit": {"type": "integer", "default": 10}}',
-                ),
-                ("filesystem", "read_file", "Read contents of a file", '{"path": {"type": "string", "required": true}}'),
-                (
-                    "filesystem",
-                    "write_file",
-                    "Write content to a file",
-                    '{"path": {"type": "string", "required": true}, "content": {"type": "string", "required": true}}',
-                ),
-                ("filesystem", "list_directory", "List files and directories", '{"path": {"type": "string", "required": true}}'),
-                (
-                    "memory",
-                    "store_memory",
-                    "Store information in memory",
-                    '{"key": {"type": "string", "required": true}, "value": {"type": "string", "required": true}}',
-                ),
-                ("memory", "retrieve_memory", "Retrieve information from memory", '{"key": {"type": "string", "required": true}}'),
-                ("memory", "list_memories", "List all stored memories", "{}"),
-            ]
-
-            for tool in default_tools:
-                cursor.execute('''
-                    INSERT OR IGNORE INTO tools (server_name, name, description, parameters)
-                    VALUES (?, ?, ?, ?)
-                ''', tool)
-
-            # Insert default resources
-            default_resources = [
-                ("sqlite", "mcp_database", _get_sqlite_uri(DB_PATH)),
-                ("filesystem", "file_system", "/"),
-                ("memory", "memory_store", "memory://"),
-            ]
-
-            for resource in default_resources:
-                cursor.execute('''
-                    INSERT OR IGNORE INTO resources (server_name, name, uri)
-                    VALUES (?, ?, ?)
-                ''', resource)
-
-            conn.commit()
+            # Insert default servers, tools and resources if they don't exist
+            _insert_rows(cursor, "servers", ("name", "uri", "enabled"), DEFAULT_SERVERS)
+            _insert_rows(cursor, "tools", ("server_name", "name", "description", "parameters"), DEFAULT_TOOLS)
+            _insert_rows(cursor, "resources", ("server_name", "name", "uri"), DEFAULT_RESOURCES)
 
         print("✅ Database initialized successfully")
 
@@ -137,11 +203,44 @@ def init_db() -> None:
         raise
 
 
+def open_connection(path: str, **kwargs: Any) -> sqlite3.Connection:
+    """Open a connection to path with SQLITE_CONNECTION_PRAGMAS applied.
+
+    synchronous and the cache settings only last for the connection, so every
+    connection needs them, not just the one that switched the file to WAL.
+    Extra keyword arguments go to ``sqlite3.connect``.
+    """
+
+    conn = sqlite3.connect(path, cached_statements=SQLITE_CACHED_STATEMENTS, **kwargs)
+    for pragma in SQLITE_CONNECTION_PRAGMAS:
+        conn.execute(pragma)
+    return conn
+
+
 def get_connection() -> sqlite3.Connection:
     """Get database connection."""
 
     _ensure_db_directory(DB_PATH)
-    return sqlite3.connect(DB_PATH)
+    return open_connection(DB_PATH)
+
+
+def get_shared_connection() -> sqlite3.Connection:
+    """Get the calling thread's long-lived connection to the database.
+
+    The connection is opened once per thread and reused, so callers must not
+    close it. Wrap writes in ``with conn:`` so they commit or roll back.
+    """
+
+    connections = getattr(_thread_local, "connections", None)
+    if connections is None:
+        connections = _thread_local.connections = {}
+
+    path = os.path.abspath(DB_PATH)
+    conn = connections.get(path)
+    if conn is None:
+        _ensure_db_directory(path)
+        conn = connections[path] = open_connection(path)
+    return conn
 
 
 def execute_query(query: str, params: tuple = ()) -> List[Dict[str, Any]]:
@@ -182,3 +281,115 @@ def execute_update(query: str, params: tuple = ()) -> int:
     except Exception as e:
         print(f"Database update error: {e}")
         return 0
+
+
+@dataclass(frozen=True)
+class MCPMetadata:
+    """Snapshot of the configured servers, tools and resources.
+
+    Tools are ``(server_name, name, description, parameters, param_keys)``
+    with the JSON parameter schema already decoded. ``tools_by_name`` maps a
+    tool name to its first tool in server order, among tools whose server
+    exists, as the tool listings only show those.
+    """
+
+    servers: Tuple[Tuple[str, str, bool], ...]
+    tools: Tuple[Tuple[str, str, str, Dict[str, Any], Tuple[str, ...]], ...]
+    resources: Tuple[Tuple[str, str, str], ...]
+    tools_by_server: Dict[str, Tuple[Tuple[str, str, str, Dict[str, Any], Tuple[str, ...]], ...]]
+    resources_by_server: Dict[str, Tuple[Tuple[str, str, str], ...]]
+    tools_by_name: Dict[str, Tuple[str, str, str, Dict[str, Any], Tuple[str, ...]]]
+
+
+def _parse_parameters(parameters: str) -> Dict[str, Any]:
+    """Decode a tool's JSON parameter schema, tolerating empty or invalid values."""
+
+    try:
+        return json.loads(parameters) if parameters else {}
+    except ValueError:
+        return {}
+
+
+def get_db_version() -> Tuple[str, int]:
+    """Return a key that changes whenever the database is written.
+
+    ``PRAGMA data_version`` changes whenever another connection commits,
+    whether in this process or another, without relying on file timestamps.
+    It only counts other connections' commits and its values are per
+    connection, so it is read from one dedicated connection per database that
+    never writes, rather than from the per-thread shared connections.
+    """
+
+    path = os.path.abspath(DB_PATH)
+    with _version_lock:
+        conn = _version_connections.get(path)
+        if conn is None:
+            _ensure_db_directory(path)
+            conn = _version_connections[path] = open_connection(path, check_same_thread=False)
+        (data_version,) = conn.execute("PRAGMA data_version").fetchone()
+    return path, data_version
+
+
+# One statement for the whole catalog; the tag column says which table a row came from
+_MCP_METADATA_QUERY = """
+    SELECT * FROM (
+        SELECT 's' AS tag, name, uri, enabled, NULL FROM servers
+        UNION ALL
+        SELECT 't', server_name, name, description, parameters FROM tools
+        UNION ALL
+        SELECT 'r', server_name, name, uri, NULL FROM resources
+    )
+    ORDER BY tag, 2, 3
+"""
+
+
+@lru_cache(maxsize=1)
+def _load_mcp_metadata(db_version: Tuple[str, int]) -> MCPMetadata:
+    """Read servers, tools and resources once per database version."""
+
+    rows = get_shared_connection().execute(_MCP_METADATA_QUERY).fetchall()
+
+    servers: List[Tuple[str, str, bool]] = []
+    tools: List[Tuple[str, str, str, Dict[str, Any], Tuple[str, ...]]] = []
+    resources: List[Tuple[str, str, str]] = []
+    tools_by_server: Dict[str, Tuple[Tuple[str, str, str, Dict[str, Any], Tuple[str, ...]], ...]] = {}
+    resources_by_server: Dict[str, Tuple[Tuple[str, str, str], ...]] = {}
+    tools_by_name: Dict[str, Tuple[str, str, str, Dict[str, Any], Tuple[str, ...]]] = {}
+    server_names = set()
+
+    # Rows arrive sorted by tag and then owning server, so each server's
+    # tools and resources are one contiguous run, and servers ('s') come
+    # before tools ('t')
+    for (tag, owner), group in groupby(rows, key=itemgetter(0, 1)):
+        if tag == "s":
+            servers.extend((name, uri, bool(enabled)) for _, name, uri, enabled, _ in group)
+            server_names.add(owner)
+        elif tag == "t":
+            server_tools = []
+            for _, _, name, description, raw_parameters in group:
+                parameters = _parse_parameters(raw_parameters)
+                server_tools.append((owner, name, description, parameters, tuple(parameters)))
+            tools.extend(server_tools)
+            tools_by_server[owner] = tuple(server_tools)
+            if owner in server_names:
+                for tool in server_tools:
+                    tools_by_name.setdefault(tool[1], tool)
+        else:
+            server_resources = tuple((owner, name, uri) for _, _, name, uri, _ in group)
+            resources.extend(server_resources)
+            resources_by_server[owner] = server_resources
+
+    return MCPMetadata(
+        servers=tuple(servers),
+        tools=tuple(tools),
+        resources=tuple(resources),
+        tools_by_server=tools_by_server,
+        resources_by_server=resources_by_server,
+        tools_by_name=tools_by_name,
+    )
+
+
+def get_mcp_metadata() -> MCPMetadata:
+    """Get the MCP catalog, re-reading the database only after it has changed."""
+
+    return _load_mcp_metadata(get_db_version())
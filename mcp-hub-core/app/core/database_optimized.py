@@ -10,6 +10,14 @@ import logging
 from functools import wraps
 import time
 
+from app.core.database import (
+    DEFAULT_RESOURCES,
+    DEFAULT_SERVERS,
+    DEFAULT_TOOLS,
+    _insert_rows,
+    open_connection,
+)
+
 logger = logging.getLogger(__name__)
 
 class DatabaseManager:
@@ -27,11 +35,13 @@ class DatabaseManager:
         with self.get_connection() as conn:
             cursor = conn.cursor()
             
-            # Enable WAL mode for better concurrency
-            cursor.execute("PRAGMA journal_mode=WAL")
-            cursor.execute("PRAGMA synchronous=NORMAL")
-            cursor.execute("PRAGMA cache_size=10000")
-            cursor.execute("PRAGMA temp_store=MEMORY")
+            # WAL and the other connection pragmas are applied by
+            # open_connection() in get_connection()
+            #
+            # sqlite3 only opens implicit transactions for DML, so without an
+            # explicit BEGIN each CREATE below would commit on its own. Schema
+            # and seed data go in as one transaction, committed below.
+            cursor.execute("BEGIN IMMEDIATE")
             
             # Create tables with proper indexes
             self._create_tables(cursor)
@@ -118,13 +128,18 @@ class DatabaseManager:
     
     def _create_indexes(self, cursor):
         """Create database indexes for better performance"""
+        # servers(name), memory(key) and tools/resources (server_name, name)
+        # are already indexed by their UNIQUE constraints; the composite
+        # ones also cover server_name lookups and ORDER BY server, name.
+        # Single-column copies of those would only slow every write, so
+        # databases created before this drop them.
         indexes = [
-            "CREATE INDEX IF NOT EXISTS idx_servers_name ON servers(name)",
+            "DROP INDEX IF EXISTS idx_servers_name",
+            "DROP INDEX IF EXISTS idx_tools_server",
+            "DROP INDEX IF EXISTS idx_resources_server",
+            "DROP INDEX IF EXISTS idx_memory_key",
             "CREATE INDEX IF NOT EXISTS idx_servers_enabled ON servers(enabled)",
-            "CREATE INDEX IF NOT EXISTS idx_tools_server ON tools(server_name)",
             "CREATE INDEX IF NOT EXISTS idx_tools_name ON tools(name)",
-            "CREATE INDEX IF NOT EXISTS idx_resources_server ON resources(server_name)",
-            "CREATE INDEX IF NOT EXISTS idx_memory_key ON memory(key)",
             "CREATE INDEX IF NOT EXISTS idx_chat_history_user ON chat_history(user_id)",
             "CREATE INDEX IF NOT EXISTS idx_chat_history_created ON chat_history(created_at)",
             "CREATE INDEX IF NOT EXISTS idx_tool_executions_tool ON tool_executions(tool_name)",
@@ -137,52 +152,12 @@ class DatabaseManager:
     def _insert_default_data(self, cursor):
         """Insert default data with proper error handling"""
         try:
-            # Default servers
-            default_servers = [
-                ('sqlite', 'sqlite://mcp.db', 1),
-                ('filesystem', 'file:///', 1),
-                ('memory', 'memory://', 1),
-            ]
-            
-            for server in default_servers:
-                cursor.execute('''
-                    INSERT OR IGNORE INTO servers (name, uri, enabled)
-                    VALUES (?, ?, ?)
-                ''', server)
-            
-            # Default tools
-            default_tools = [
-                ('sqlite', 'query_database', 'Execute SQL queries on the database', '{"query": {"type": "string", "required": true}}'),
-                ('sqlite', 'list_tables', 'List all tables in the database', '{}'),
-                ('sqlite', 'describe_table', 'Get table schema information', '{"table_name": {"type": "string", "required": true}}'),
-                ('sqlite', 'get_table_data', 'Get sample data from a table', '{"table_name": {"type": "string", "required": true}, "limit": {"type": "integer", "default": 10}}'),
-                ('filesystem', 'read_file', 'Read contents of a file', '{"path": {"type": "string", "required": true}}'),
-                ('filesystem', 'write_file', 'Write content to a file', '{"path": {"type": "string", "required": true}, "content": {"type": "string", "required": true}}'),
-                ('filesystem', 'list_directory', 'List files and directories', '{"path": {"type": "string", "required": true}}'),
-                ('memory', 'store_memory', 'Store information in memory', '{"key": {"type": "string", "required": true}, "value": {"type": "string", "required": true}}'),
-                ('memory', 'retrieve_memory', 'Retrieve information from memory', '{"key": {"type": "string", "required": true}}'),
-                ('memory', 'list_memories', 'List all stored memories', '{}'),
-            ]
+            # One multi-row INSERT per table, chunked to the bound-variable
+            # limit, instead of a statement execution per row
+            _insert_rows(cursor, "servers", ("name", "uri", "enabled"), DEFAULT_SERVERS)
+            _insert_rows(cursor, "tools", ("server_name", "name", "description", "parameters"), DEFAULT_TOOLS)
+            _insert_rows(cursor, "resources", ("server_name", "name", "uri"), DEFAULT_RESOURCES)
             
-            for tool in default_tools:
-                cursor.execute('''
-                    INSERT OR IGNORE INTO tools (server_name, name, description, parameters)
-                    VALUES (?, ?, ?, ?)
-                ''', tool)
-            
-            # Default resources
-            default_resources = [
-                ('sqlite', 'mcp_database', 'sqlite://mcp.db'),
-                ('filesystem', 'file_system', '/'),
-                ('memory', 'memory_store', 'memory://'),
-            ]
-            
-            for resource in default_resources:
-                cursor.execute('''
-                    INSERT OR IGNORE INTO resources (server_name, name, uri)
-                    VALUES (?, ?, ?)
-                ''', resource)
-                
         except Exception as e:
             logger.error(f"Error inserting default data: {e}")
             raise
@@ -196,7 +171,7 @@ class DatabaseManager:
                 if self._connections:
                     conn = self._connections.pop()
                 else:
-                    conn = sqlite3.connect(
+                    conn = open_connection(
                         self.db_path,
                         timeout=30.0,
                         check_same_thread=False
@@ -213,10 +188,28 @@ class DatabaseManager:
             raise
         finally:
             if conn:
-                try:
-                    conn.close()
-                except Exception as e:
-                    logger.error(f"Error closing connection: {e}")
+                self._release_connection(conn)
+    
+    def _release_connection(self, conn: sqlite3.Connection):
+        """Return a connection to the pool, or close it if the pool is full"""
+        try:
+            # Never hand the next caller a transaction this one left open
+            if conn.in_transaction:
+                conn.rollback()
+            with self._lock:
+                if len(self._connections) < self.max_connections:
+                    self._connections.append(conn)
+                    return
+            conn.close()
+        except Exception as e:
+            logger.error(f"Error releasing connection: {e}")
+    
+    def close_all(self):
+        """Close every pooled connection"""
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
     
     def execute_query(self, query: str, params: tuple = ()) -> List[Dict[str, Any]]:
         """Execute a query and return results as list of dictionaries"""
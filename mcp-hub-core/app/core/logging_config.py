@@ -5,6 +5,7 @@ Structured logging configuration for MCP Hub Core
 import logging
 import logging.config
 import sys
+import time
 import json
 from datetime import datetime
 from typing import Dict, Any, Optional
@@ -167,11 +168,11 @@ def log_execution_time(func):
     """Decorator to log function execution time"""
     def wrapper(*args, **kwargs):
         logger = get_logger(func.__module__)
-        start_time = datetime.now()
+        start_time = time.perf_counter()
         
         try:
             result = func(*args, **kwargs)
-            execution_time = (datetime.now() - start_time).total_seconds()
+            execution_time = time.perf_counter() - start_time
             
             logger.info(
                 f"Function {func.__name__} executed successfully",
@@ -185,7 +186,7 @@ def log_execution_time(func):
             return result
             
         except Exception as e:
-            execution_time = (datetime.now() - start_time).total_seconds()
+            execution_time = time.perf_counter() - start_time
             
             logger.error(
                 f"Function {func.__name__} failed: {str(e)}",
@@ -206,11 +207,11 @@ def log_api_request(func):
     """Decorator to log API requests"""
     def wrapper(*args, **kwargs):
         logger = get_logger('api')
-        start_time = datetime.now()
+        start_time = time.perf_counter()
         
         try:
             result = func(*args, **kwargs)
-            execution_time = (datetime.now() - start_time).total_seconds()
+            execution_time = time.perf_counter() - start_time
             
             logger.info(
                 f"API request {func.__name__} completed",
@@ -224,7 +225,7 @@ def log_api_request(func):
             return result
             
         except Exception as e:
-            execution_time = (datetime.now() - start_time).total_seconds()
+            execution_time = time.perf_counter() - start_time
             
             logger.error(
                 f"API request {func.__name__} failed: {str(e)}",
@@ -245,7 +246,7 @@ def log_tool_execution(func):
     """Decorator to log tool executions"""
     def wrapper(*args, **kwargs):
         logger = get_logger('tools')
-        start_time = datetime.now()
+        start_time = time.perf_counter()
         
         # Extract tool information from arguments
         tool_name = kwargs.get('tool_name', 'unknown')
@@ -253,7 +254,7 @@ def log_tool_execution(func):
         
         try:
             result = func(*args, **kwargs)
-            execution_time = (datetime.now() - start_time).total_seconds()
+            execution_time = time.perf_counter() - start_time
             
             logger.info(
                 f"Tool {tool_name} executed successfully",
@@ -268,7 +269,7 @@ def log_tool_execution(func):
             return result
             
         except Exception as e:
-            execution_time = (datetime.now() - start_time).total_seconds()
+            execution_time = time.perf_counter() - start_time
             
             logger.error(
                 f"Tool {tool_name} execution failed: {str(e)}",
@@ -290,7 +291,7 @@ def log_llm_request(func):
     """Decorator to log LLM requests"""
     def wrapper(*args, **kwargs):
         logger = get_logger('llm')
-        start_time = datetime.now()
+        start_time = time.perf_counter()
         
         # Extract provider information
         provider = kwargs.get('provider', 'unknown')
@@ -298,7 +299,7 @@ def log_llm_request(func):
         
         try:
             result = func(*args, **kwargs)
-            execution_time = (datetime.now() - start_time).total_seconds()
+            execution_time = time.perf_counter() - start_time
             
             logger.info(
                 f"LLM request to {provider} completed",
@@ -314,7 +315,7 @@ def log_llm_request(func):
             return result
             
         except Exception as e:
-            execution_time = (datetime.now() - start_time).total_seconds()
+            execution_time = time.perf_counter() - start_time
             
             logger.error(
                 f"LLM request to {provider} failed: {str(e)}",
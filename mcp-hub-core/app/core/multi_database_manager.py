@@ -5,13 +5,15 @@ Supports multiple database connections and routing
 
 import asyncio
 import logging
-from typing import Dict, List, Any, Optional
+from typing import Awaitable, Callable, Dict, List, Any, Optional
 from contextlib import asynccontextmanager
 from dataclasses import dataclass
 from enum import Enum
 import sqlite3
 import json
-from datetime import datetime
+import time
+from itertools import groupby
+from operator import itemgetter
 
 # Optional imports for database drivers
 try:
@@ -38,6 +40,20 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+# Columns of every SQLite table, in table creation then column order; the
+# same fields PRAGMA table_info returns, tagged with their table name
+_SQLITE_SCHEMA_QUERY = """
+    SELECT m.name AS table_name, p.cid, p.name, p.type, p."notnull", p.dflt_value, p.pk
+    FROM sqlite_master AS m
+    JOIN pragma_table_info(m.name) AS p
+    WHERE m.type = 'table'
+    ORDER BY m.rowid, p.cid
+"""
+
+# Upper bound on databases queried at once by the *_all_databases helpers,
+# so a large fleet cannot exhaust every connection pool in one call
+MAX_CONCURRENT_DATABASES = 16
+
 class DatabaseType(Enum):
     POSTGRESQL = "postgresql"
     SQLITE = "sqlite"
@@ -194,7 +210,7 @@ class MultiDatabaseManager:
         params: Optional[Dict[str, Any]] = None
     ) -> QueryResult:
         """Execute query on specific database"""
-        start_time = datetime.now()
+        start_time = time.perf_counter()
         
         try:
             async with self.get_connection(database_name) as conn:
@@ -231,7 +247,7 @@ class MultiDatabaseManager:
                     if conn.in_transaction:
                         conn.commit()
                 
-                execution_time = (datetime.now() - start_time).total_seconds()
+                execution_time = time.perf_counter() - start_time
                 
                 return QueryResult(
                     database_name=database_name,
@@ -244,7 +260,7 @@ class MultiDatabaseManager:
                 )
                 
         except Exception as e:
-            execution_time = (datetime.now() - start_time).total_seconds()
+            execution_time = time.perf_counter() - start_time
             logger.error(f"Query execution failed on {database_name}: {e}")
             
             return QueryResult(
@@ -264,27 +280,23 @@ class MultiDatabaseManager:
         params: Optional[Dict[str, Any]] = None
     ) -> Dict[str, QueryResult]:
         """Execute query on all active databases"""
-        results = {}
-        
-        for db_name, config in self.configs.items():
-            if config.is_active:
-                try:
-                    result = await self.execute_query(db_name, query, params)
-                    results[db_name] = result
-                except Exception as e:
-                    logger.error(f"Failed to execute query on {db_name}: {e}")
-                    results[db_name] = QueryResult(
-                        database_name=db_name,
-                        query=query,
-                        data=[],
-                        columns=[],
-                        row_count=0,
-                        execution_time=0,
-                        success=False,
-                        error=str(e)
-                    )
+        async def query_one(db_name: str) -> QueryResult:
+            try:
+                return await self.execute_query(db_name, query, params)
+            except Exception as e:
+                logger.error(f"Failed to execute query on {db_name}: {e}")
+                return QueryResult(
+                    database_name=db_name,
+                    query=query,
+                    data=[],
+                    columns=[],
+                    row_count=0,
+                    execution_time=0,
+                    success=False,
+                    error=str(e)
+                )
         
-        return results
+        return await self._gather_active(query_one)
     
     async def get_database_schema(self, database_name: str) -> Dict[str, Any]:
         """Get database schema information"""
@@ -311,27 +323,26 @@ class MultiDatabaseManager:
                 }
                 
             elif self.configs[database_name].type == DatabaseType.SQLITE:
-                # Get SQLite schema
-                tables_query = "SELECT name FROM sqlite_master WHERE type='table';"
-                tables_result = await self.execute_query(database_name, tables_query)
+                # Get SQLite schema: every table's columns in one query,
+                # grouped per table here instead of a PRAGMA per table
+                columns_result = await self.execute_query(database_name, _SQLITE_SCHEMA_QUERY)
                 
                 schema = {
                     'database_name': database_name,
                     'type': 'sqlite',
-                    'tables': [],
-                    'success': True
+                    'tables': [
+                        {
+                            'table_name': table_name,
+                            'columns': [
+                                {key: value for key, value in column.items() if key != 'table_name'}
+                                for column in columns
+                            ]
+                        }
+                        for table_name, columns in groupby(columns_result.data, key=itemgetter('table_name'))
+                    ],
+                    'success': columns_result.success
                 }
                 
-                for table in tables_result.data:
-                    table_name = table['name']
-                    columns_query = f"PRAGMA table_info({table_name});"
-                    columns_result = await self.execute_query(database_name, columns_query)
-                    
-                    schema['tables'].append({
-                        'table_name': table_name,
-                        'columns': columns_result.data
-                    })
-                
                 return schema
                 
         except Exception as e:
@@ -346,14 +357,22 @@ class MultiDatabaseManager:
     
     async def get_all_schemas(self) -> Dict[str, Dict[str, Any]]:
         """Get schemas for all databases"""
-        schemas = {}
+        return await self._gather_active(self.get_database_schema)
+    
+    async def _gather_active(self, func: Callable[[str], Awaitable[Any]]) -> Dict[str, Any]:
+        """Run func for every active database concurrently, keyed by name
+        
+        At most MAX_CONCURRENT_DATABASES calls are in flight at once.
+        Results keep the order the databases were added in.
+        """
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_DATABASES)
         
-        for db_name in self.configs.keys():
-            if self.configs[db_name].is_active:
-                schema = await self.get_database_schema(db_name)
-                schemas[db_name] = schema
+        async def run(db_name: str) -> Any:
+            async with semaphore:
+                return await func(db_name)
         
-        return schemas
+        db_names = [db_name for db_name, config in self.configs.items() if config.is_active]
+        return dict(zip(db_names, await asyncio.gather(*(run(db_name) for db_name in db_names))))
     
     async def search_across_databases(
         self, 
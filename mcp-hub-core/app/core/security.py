@@ -3,6 +3,7 @@ Enhanced security implementation for MCP Hub Core
 """
 
 import hashlib
+import html
 import secrets
 import jwt
 import bcrypt
@@ -72,6 +73,7 @@ class SecurityManager:
     def _create_default_users(self) -> Dict[str, User]:
         """Create default users for demo purposes"""
         users = {}
+        created_at = datetime.now()
         
         # Admin user
         admin_password = self.hash_password("admin123")
@@ -81,7 +83,7 @@ class SecurityManager:
             email="admin@mcp-hub.com",
             role="admin",
             is_active=True,
-            created_at=datetime.now()
+            created_at=created_at
         )
         users["admin"].password_hash = admin_password
         
@@ -93,7 +95,7 @@ class SecurityManager:
             email="user@mcp-hub.com",
             role="user",
             is_active=True,
-            created_at=datetime.now()
+            created_at=created_at
         )
         users["user"].password_hash = user_password
         
@@ -294,7 +296,6 @@ def rate_limit(max_requests: int = 100, window: int = 60):
 
 def sanitize_input(text: str) -> str:
     """Sanitize user input to prevent XSS"""
-    import html
     return html.escape(text)
 
 def validate_sql_query(query: str) -> bool:
@@ -203,18 +203,16 @@ class DatabaseChatService:
                 result = await self.db_manager.execute_query(intent['database_specific'], "SELECT 1 as health_check")
                 response = f"Database '{intent['database_specific']}' is {'healthy' if result.success else 'unhealthy'}"
             else:
-                # Check all databases
-                databases = self.db_manager.get_database_list()
-                health_status = []
-                
-                for db in databases:
-                    if db['is_active']:
-                        result = await self.db_manager.execute_query(db['name'], "SELECT 1 as health_check")
-                        health_status.append({
-                            'database': db['name'],
-                            'status': 'healthy' if result.success else 'unhealthy',
-                            'response_time': result.execution_time
-                        })
+                # Check all active databases at once
+                results = await self.db_manager.execute_query_all_databases("SELECT 1 as health_check")
+                health_status = [
+                    {
+                        'database': db_name,
+                        'status': 'healthy' if result.success else 'unhealthy',
+                        'response_time': result.execution_time
+                    }
+                    for db_name, result in results.items()
+                ]
                 
                 response = await self._format_health_response(health_status)
             
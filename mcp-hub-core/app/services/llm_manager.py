@@ -4,14 +4,16 @@ Handles multiple LLM providers (OpenAI, Google, Anthropic)
 """
 
 import os
-import asyncio
-from typing import List, Dict, Any, Optional
-from datetime import datetime
-import openai
-import google.generativeai as genai
-import anthropic
+import time
+from typing import List, Dict, Any, Optional, AsyncIterator
 from pydantic import BaseModel
 
+from app.core.cache import CacheUtils, cache_manager
+from app.core.config import settings
+
+# Identical prompts repeat often (e.g. "list tables"), so replies are reused for an hour
+LLM_RESPONSE_CACHE_TTL = 3600
+
 class LLMResponse(BaseModel):
     content: str
     provider: str
@@ -19,6 +21,8 @@ class LLMResponse(BaseModel):
     tokens_used: Optional[int] = None
     response_time: float
     finish_reason: Optional[str] = None
+    # True when the reply was served from the response cache
+    cached: bool = False
 
 class LLMManager:
     """Manages multiple LLM providers"""
@@ -29,11 +33,10 @@ class LLMManager:
     
     def initialize_providers(self):
         """Initialize available LLM providers"""
-        from app.core.config import settings
-        
         # OpenAI
         if settings.openai_api_key:
             try:
+                import openai
                 openai.api_key = settings.openai_api_key
                 self.providers['openai'] = {
                     'name': 'OpenAI',
@@ -47,6 +50,7 @@ class LLMManager:
         # Google Gemini
         if settings.google_api_key:
             try:
+                import google.generativeai as genai
                 genai.configure(api_key=settings.google_api_key)
                 self.providers['google'] = {
                     'name': 'Google',
@@ -79,10 +83,11 @@ class LLMManager:
         provider: str = "openai",
         model: Optional[str] = None,
         max_tokens: int = 2000,
-        temperature: float = 0.3
+        temperature: float = 0.3,
+        force_refresh: bool = False
     ) -> LLMResponse:
-        """Generate response from specified provider"""
-        start_time = datetime.now()
+        """Generate response from specified provider, reusing cached replies unless force_refresh"""
+        start_time = time.perf_counter()
         
         if provider not in self.providers:
             raise ValueError(f"Provider {provider} not available")
@@ -90,6 +95,18 @@ class LLMManager:
         if not model:
             model = self.providers[provider]['default_model']
         
+        cache_key = CacheUtils.llm_response_key(provider, model, messages, temperature, max_tokens)
+        if not force_refresh:
+            cached = cache_manager.get(cache_key)
+            if cached is not None:
+                # Report this call's own latency and spend, not the stored call's
+                return LLMResponse(**{
+                    **cached,
+                    "tokens_used": 0,
+                    "response_time": time.perf_counter() - start_time,
+                    "cached": True
+                })
+        
         try:
             if provider == 'openai':
                 response = await self._generate_openai_response(
@@ -106,10 +123,9 @@ class LLMManager:
             else:
                 raise ValueError(f"Unsupported provider: {provider}")
             
-            end_time = datetime.now()
-            response_time = (end_time - start_time).total_seconds()
+            response_time = time.perf_counter() - start_time
             
-            return LLMResponse(
+            llm_response = LLMResponse(
                 content=response['content'],
                 provider=provider,
                 model=model,
@@ -117,14 +133,46 @@ class LLMManager:
                 response_time=response_time,
                 finish_reason=response.get('finish_reason')
             )
+            cache_manager.set(cache_key, llm_response.model_dump(), LLM_RESPONSE_CACHE_TTL)
+            return llm_response
             
         except Exception as e:
             raise Exception(f"LLM generation failed: {e}")
     
+    async def stream_response_async(
+        self,
+        messages: List[Dict[str, str]],
+        provider: str = "openai",
+        model: Optional[str] = None,
+        max_tokens: int = 2000,
+        temperature: float = 0.3
+    ) -> AsyncIterator[str]:
+        """Stream response text from specified provider as it is generated"""
+        if provider not in self.providers:
+            raise ValueError(f"Provider {provider} not available")
+        
+        if not model:
+            model = self.providers[provider]['default_model']
+        
+        if provider == 'openai':
+            stream = self._stream_openai_response(messages, model, max_tokens, temperature)
+        elif provider == 'google':
+            stream = self._stream_google_response(messages, model, max_tokens, temperature)
+        elif provider == 'anthropic':
+            stream = self._stream_anthropic_response(messages, model, max_tokens, temperature)
+        else:
+            raise ValueError(f"Unsupported provider: {provider}")
+        
+        try:
+            async for delta in stream:
+                yield delta
+        except Exception as e:
+            raise Exception(f"LLM streaming failed: {e}")
+    
     async def _generate_openai_response(self, messages, model, max_tokens, temperature):
         """Generate response using OpenAI"""
         try:
-            from app.core.config import settings
+            import openai
             client = openai.AsyncOpenAI(api_key=settings.openai_api_key)
             
             response = await client.chat.completions.create(
@@ -145,6 +193,8 @@ class LLMManager:
     async def _generate_google_response(self, messages, model, max_tokens, temperature):
         """Generate response using Google Gemini"""
         try:
+            import google.generativeai as genai
+            
             # Convert messages to Gemini format
             prompt = self._convert_messages_to_prompt(messages)
             
@@ -168,6 +218,7 @@ class LLMManager:
     async def _generate_anthropic_response(self, messages, model, max_tokens, temperature):
         """Generate response using Anthropic Claude"""
         try:
+            import anthropic
             client = anthropic.AsyncAnthropic(api_key=os.getenv('ANTHROPIC_API_KEY'))
             
             # Convert messages to Claude format
@@ -198,6 +249,67 @@ class LLMManager:
         except Exception as e:
             raise Exception(f"Anthropic API error: {e}")
     
+    async def _stream_openai_response(self, messages, model, max_tokens, temperature):
+        """Stream response using OpenAI"""
+        import openai
+        client = openai.AsyncOpenAI(api_key=settings.openai_api_key)
+        
+        stream = await client.chat.completions.create(
+            model=model,
+            messages=messages,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            stream=True
+        )
+        
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+    
+    async def _stream_google_response(self, messages, model, max_tokens, temperature):
+        """Stream response using Google Gemini"""
+        import google.generativeai as genai
+        
+        prompt = self._convert_messages_to_prompt(messages)
+        
+        model_instance = genai.GenerativeModel(model)
+        response = await model_instance.generate_content_async(
+            prompt,
+            generation_config=genai.types.GenerationConfig(
+                max_output_tokens=max_tokens,
+                temperature=temperature
+            ),
+            stream=True
+        )
+        
+        async for chunk in response:
+            if chunk.text:
+                yield chunk.text
+    
+    async def _stream_anthropic_response(self, messages, model, max_tokens, temperature):
+        """Stream response using Anthropic Claude"""
+        import anthropic
+        client = anthropic.AsyncAnthropic(api_key=os.getenv('ANTHROPIC_API_KEY'))
+        
+        system_message = ""
+        user_messages = []
+        
+        for message in messages:
+            if message['role'] == 'system':
+                system_message = message['content']
+            else:
+                user_messages.append(message['content'])
+        
+        async with client.messages.stream(
+            model=model,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            system=system_message,
+            messages=[{"role": "user", "content": "\n".join(user_messages)}]
+        ) as stream:
+            async for text in stream.text_stream:
+                yield text
+    
     def _convert_messages_to_prompt(self, messages):
         """Convert chat messages to a single prompt"""
         prompt_parts = []
@@ -3,61 +3,444 @@ MCP Executor for MCP Hub Core
 Handles execution of MCP tools and resources
 """
 
+import asyncio
+import codecs
+import errno
 import sqlite3
 import os
 import json
-from typing import Dict, Any, List, Optional
-from datetime import datetime
+import re
+import stat
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+from functools import lru_cache
+from typing import Awaitable, Callable, Dict, Any, List, Optional, Tuple
+
+from app.core import database
+from app.core.database import get_mcp_metadata, open_connection
+
+# orjson is optional; when present TOOL_EXECUTE payloads are parsed in C
+try:
+    from orjson import loads as _loads_json
+except ImportError:
+    from json import loads as _loads_json
+
+# msgspec is optional; when present TOOL_EXECUTE payloads decode straight
+# into a typed struct, checking their shape in the same pass
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+# Marks each tool request in an LLM response; a JSON object follows it
+_TOOL_MARKER = 'TOOL_EXECUTE:'
+
+# JSON strings, matched whole so braces inside them are skipped, and braces
+_JSON_BRACE_TOKEN = re.compile(r'"(?:[^"\\]|\\.)*"|[{}]')
+
+def _json_object_end(text: str, start: int) -> int:
+    """Return the index just past the JSON object opening at text[start], or -1
+    
+    Only braces are counted, so the payload is decoded once, by
+    _parse_tool_request, rather than once here to find its end.
+    """
+    if not text.startswith('{', start):
+        return -1
+    depth = 0
+    for match in _JSON_BRACE_TOKEN.finditer(text, start):
+        token = match.group()
+        if token == '{':
+            depth += 1
+        elif token == '}':
+            depth -= 1
+            if depth == 0:
+                return match.end()
+    return -1
+
+def _tool_payloads(text: str):
+    """Yield the JSON payload text following each TOOL_EXECUTE marker
+    
+    A marker not followed by a complete JSON object yields the rest of its
+    line instead, so the caller reports it rather than dropping it.
+    """
+    index = text.find(_TOOL_MARKER)
+    while index != -1:
+        start = index + len(_TOOL_MARKER)
+        while start < len(text) and text[start].isspace():
+            start += 1
+        end = _json_object_end(text, start)
+        if end == -1:
+            end = text.find('\n', start)
+            if end == -1:
+                end = len(text)
+        yield text[start:end]
+        index = text.find(_TOOL_MARKER, end)
+
+# Worker threads for blocking tool I/O; read-only TOOL_EXECUTE requests from
+# one response run side by side. A bad MCP_TOOL_WORKERS falls back to the
+# default rather than failing the import.
+try:
+    TOOL_WORKERS = max(1, int(os.getenv("MCP_TOOL_WORKERS", "8")))
+except ValueError:
+    TOOL_WORKERS = 8
+
+# Default cap on rows returned by query_database
+QUERY_ROW_LIMIT = 100
+
+# Default number of bytes read_file returns per call; larger files are read
+# a window at a time via "offset" instead of being loaded whole
+READ_FILE_CHUNK = 1 << 20
+
+# Directory the filesystem tools are confined to; unset leaves them
+# unrestricted. Resolved once here so each call only resolves its own path.
+FS_ROOT = os.getenv("MCP_FS_ROOT")
+if FS_ROOT:
+    FS_ROOT = os.path.realpath(FS_ROOT)
+
+# Statements that can only read, for ordering and batching tool calls. WITH
+# and PRAGMA may write too (WITH ... INSERT, PRAGMA user_version = 1), so
+# they count as writes. One tuple startswith on a short uppercased slice
+# classifies a query without copying all of it.
+_READ_QUERY_PREFIXES = ("SELECT", "EXPLAIN", "VALUES")
+_READ_PREFIX_LEN = max(len(prefix) for prefix in _READ_QUERY_PREFIXES)
+
+def _is_read_query(query: str) -> bool:
+    """Return True if a SQL statement can only read"""
+    return query.lstrip()[:_READ_PREFIX_LEN].upper().startswith(_READ_QUERY_PREFIXES)
+
+def _is_pragma(query: str) -> bool:
+    """Return True if a SQL statement is a PRAGMA"""
+    return query.lstrip()[:6].upper() == "PRAGMA"
+
+# Fixed tool statements, kept as constants so each connection's statement
+# cache (SQLITE_CACHED_STATEMENTS) always hits on the same SQL text
+_SQL_UPSERT_MEMORY = """
+    INSERT INTO memory (key, value, updated_at)
+    VALUES (?, ?, CURRENT_TIMESTAMP)
+    ON CONFLICT(key) DO UPDATE SET
+        value = excluded.value,
+        updated_at = excluded.updated_at
+"""
+_SQL_SELECT_MEMORY = "SELECT value FROM memory WHERE key = ?"
+_SQL_LIST_MEMORIES = "SELECT key, value, created_at FROM memory ORDER BY created_at DESC"
+_SQL_LIST_MEMORIES_LIMIT = f"{_SQL_LIST_MEMORIES} LIMIT ?"
+_SQL_LIST_TABLES = "SELECT name FROM sqlite_master WHERE type='table'"
+_SQL_TABLE_INFO = 'SELECT name, type, "notnull", pk FROM pragma_table_info(?)'
+_SQL_SCHEMA_VERSION = "PRAGMA schema_version"
+
+def _quote_identifier(name: str) -> str:
+    """Quote an SQL identifier, escaping embedded double quotes"""
+    return '"' + name.replace('"', '""') + '"'
+
+def _tool_result(server: str, tool: str, result: Any, **extra: Any) -> Dict[str, Any]:
+    """Build the envelope for a successful tool call"""
+    return {"server": server, "tool": tool, "result": result, **extra, "success": True}
+
+def _tool_error(server: str, tool: str, error: str) -> Dict[str, Any]:
+    """Build the envelope for a tool call that failed"""
+    return {"server": server, "tool": tool, "error": error, "success": False}
+
+def _unknown_tool(server: str, tool: str) -> Dict[str, Any]:
+    """Build the envelope for a tool name the server has no handler for"""
+    return {"server": server, "tool": tool, "result": f"Unknown tool: {tool}", "success": False}
+
+if msgspec is not None:
+    class ToolRequest(msgspec.Struct):
+        """A TOOL_EXECUTE payload"""
+        tool: str
+        arguments: Dict[str, Any] = {}
+        server: Optional[str] = None
+    
+    _tool_request_decoder = msgspec.json.Decoder(ToolRequest)
+    _TOOL_REQUEST_ERRORS = (msgspec.MsgspecError,)
+    
+    def _parse_tool_request(payload: str) -> Tuple[str, Dict[str, Any]]:
+        """Decode a TOOL_EXECUTE payload into its tool name and arguments"""
+        request = _tool_request_decoder.decode(payload)
+        return request.tool, request.arguments
+else:
+    _TOOL_REQUEST_ERRORS = ()
+    
+    def _parse_tool_request(payload: str) -> Tuple[str, Dict[str, Any]]:
+        """Decode a TOOL_EXECUTE payload into its tool name and arguments"""
+        request = _loads_json(payload)
+        return request['tool'], request.get('arguments', {})
+
+def _resolve_path(path: str) -> str:
+    """Resolve a filesystem tool path, rejecting paths outside FS_ROOT
+    
+    The path is canonicalised with symlinks followed, so neither ".."
+    components nor links can lead out of the sandbox.
+    """
+    if not FS_ROOT:
+        return path
+    resolved = os.path.realpath(path)
+    if resolved != FS_ROOT and not resolved.startswith(FS_ROOT.rstrip(os.sep) + os.sep):
+        raise PermissionError(f"Path is outside the filesystem root: {path}")
+    return resolved
+
+# File tools go through raw descriptors: they move whole byte strings, so
+# the buffered and text layers open() stacks on top are pure overhead
+def _read_bytes(path: str, offset: int, size: int) -> bytes:
+    """Read up to size bytes of a file starting at offset"""
+    fd = os.open(path, os.O_RDONLY | getattr(os, 'O_BINARY', 0))
+    try:
+        os.lseek(fd, offset, os.SEEK_SET)
+        chunks = []
+        while size > 0:
+            chunk = os.read(fd, size)
+            if not chunk:
+                break
+            chunks.append(chunk)
+            size -= len(chunk)
+        return b"".join(chunks)
+    finally:
+        os.close(fd)
+
+def _write_all(fd: int, data: bytes) -> None:
+    """Write all of data to a file descriptor"""
+    view = memoryview(data)
+    while view:
+        view = view[os.write(fd, view):]
+
+def _copy_file_metadata(fd: int, source_path: str, source_stat: os.stat_result) -> None:
+    """Give the file open on fd the owner, mode and extended attributes of source_path
+    
+    Extended attributes carry ACLs too. Raises OSError if any of them
+    cannot be copied.
+    """
+    if hasattr(os, 'fchown') and (source_stat.st_uid, source_stat.st_gid) != os.fstat(fd)[4:6]:
+        os.fchown(fd, source_stat.st_uid, source_stat.st_gid)
+    # After chown, which may clear setuid/setgid bits
+    if hasattr(os, 'fchmod'):
+        os.fchmod(fd, stat.S_IMODE(source_stat.st_mode))
+    if hasattr(os, 'listxattr'):
+        try:
+            names = os.listxattr(source_path)
+        except OSError as e:
+            if e.errno != errno.ENOTSUP:
+                raise
+            names = []
+        for name in names:
+            os.setxattr(fd, name, os.getxattr(source_path, name))
+
+def _write_bytes(path: str, data: bytes) -> None:
+    """Replace a file's contents with data, atomically where possible
+    
+    The bytes go to a temporary file beside the target, which is then
+    renamed over it, so a failed write never leaves a half-written file.
+    Symlinks are resolved first so the link survives and its target is
+    replaced. If the target's owner, mode or extended attributes cannot be
+    carried over to the new file, it is overwritten in place instead.
+    """
+    path = os.path.realpath(path)
+    try:
+        target_stat = os.stat(path)
+    except FileNotFoundError:
+        target_stat = None
+    
+    temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, 'O_BINARY', 0), 0o666)
+    try:
+        try:
+            _write_all(fd, data)
+            metadata_copied = True
+            if target_stat is not None:
+                try:
+                    _copy_file_metadata(fd, path, target_stat)
+                except OSError:
+                    metadata_copied = False
+        finally:
+            os.close(fd)
+        if metadata_copied:
+            os.replace(temp_path, path)
+            return
+        os.unlink(temp_path)
+    except BaseException:
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+        raise
+    
+    # Could not build an identical replacement: keep the file's identity and
+    # rewrite its contents
+    fd = os.open(path, os.O_WRONLY | os.O_TRUNC | getattr(os, 'O_BINARY', 0))
+    try:
+        _write_all(fd, data)
+    finally:
+        os.close(fd)
+
+# Per-thread SQLite connections, keyed by database path
+_thread_local = threading.local()
+
+def _thread_connection(path: str) -> sqlite3.Connection:
+    """Get the calling thread's long-lived connection to the database at path"""
+    connections = getattr(_thread_local, 'connections', None)
+    if connections is None:
+        connections = _thread_local.connections = {}
+    
+    conn = connections.get(path)
+    if conn is None:
+        # Autocommit: each statement commits on its own, no implicit BEGIN
+        conn = connections[path] = open_connection(path, isolation_level=None)
+    return conn
+
+def _thread_cursor(path: str) -> sqlite3.Cursor:
+    """Get the calling thread's reusable cursor on its connection to path
+    
+    Only statements that run to completion may use it; a result set left
+    part-read keeps its read snapshot open until the cursor runs again.
+    """
+    cursors = getattr(_thread_local, 'cursors', None)
+    if cursors is None:
+        cursors = _thread_local.cursors = {}
+    
+    cursor = cursors.get(path)
+    if cursor is None:
+        cursor = cursors[path] = _thread_connection(path).cursor()
+    return cursor
+
+# Field order of each column tuple in a table schema
+_TABLE_SCHEMA_FIELDS = ("name", "type", "not_null", "primary_key")
+
+@lru_cache(maxsize=128)
+def _load_table_schema(path: str, table_name: str, schema_version: int) -> tuple:
+    """Return a table's (name, type, not_null, primary_key) columns
+    
+    schema_version is part of the cache key only. It is SQLite's own schema
+    cookie, so DDL from any connection or process invalidates the entry.
+    """
+    return tuple(
+        (name, column_type, not_null != 0, primary_key != 0)
+        for name, column_type, not_null, primary_key
+        in _thread_cursor(path).execute(_SQL_TABLE_INFO, (table_name,))
+    )
 
 class MCPExecutor:
     """Executes MCP tools and manages resources"""
     
     def __init__(self):
-        self.db_path = 'mcp.db'
+        # The same database the catalog and API read, so MCP_DB_PATH moves both
+        self.db_path = database.DB_PATH
+        # Tool I/O gets its own workers so a burst of tool calls cannot
+        # starve the event loop's default executor
+        self._tool_pool = ThreadPoolExecutor(max_workers=TOOL_WORKERS, thread_name_prefix='mcp-tool')
+        # Tool handlers by name; each server looks its tool up in one dict
+        # instead of walking an if/elif chain
+        self._sqlite_tools = {
+            "query_database": self._query_database,
+            "list_tables": self._list_tables,
+            "describe_table": self._describe_table,
+            "get_table_data": self._get_table_data,
+        }
+        self._filesystem_tools = {
+            "read_file": self._read_file,
+            "write_file": self._write_file,
+            "list_directory": self._list_directory,
+        }
+        self._memory_tools = {
+            "store_memory": self._store_memory,
+            "retrieve_memory": self._retrieve_memory,
+            "list_memories": self._list_memories,
+        }
+        self._server_executors = {
+            "sqlite": self.execute_sqlite_tool,
+            "filesystem": self.execute_filesystem_tool,
+            "memory": self.execute_memory_tool,
+        }
         self.initialize_database()
     
+    def _get_connection(self) -> sqlite3.Connection:
+        """Get the calling thread's long-lived connection to the MCP database
+        
+        Connections are cached per worker thread and database file, so tool
+        calls skip the open, schema parse and cold page cache of a new one.
+        """
+        return _thread_connection(os.path.abspath(self.db_path))
+    
+    def _get_cursor(self) -> sqlite3.Cursor:
+        """Get the calling thread's reusable cursor on the MCP database"""
+        return _thread_cursor(os.path.abspath(self.db_path))
+    
+    def _table_schema(self, table_name: str) -> tuple:
+        """Get a table's cached columns; empty if the table does not exist"""
+        path = os.path.abspath(self.db_path)
+        schema_version = _thread_cursor(path).execute(_SQL_SCHEMA_VERSION).fetchone()[0]
+        return _load_table_schema(path, table_name, schema_version)
+    
+    async def _run_in_pool(self, func: Callable[..., Dict[str, Any]], *args: Any) -> Dict[str, Any]:
+        """Run a blocking tool implementation on the tool thread pool"""
+        return await asyncio.get_running_loop().run_in_executor(self._tool_pool, func, *args)
+    
+    def _run_standalone(
+        self,
+        runner: Callable[[str, Dict[str, Any]], Dict[str, Any]],
+        server: str,
+        tool_name: str,
+        arguments: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Run one database tool call on its own (blocking, runs in a worker thread)
+        
+        The worker's connection outlives the call, so a transaction the call
+        opened (a BEGIN through query_database) is rolled back here rather
+        than left holding the write lock with later writes never committed.
+        """
+        result = runner(tool_name, arguments)
+        conn = self._get_connection()
+        if conn.in_transaction:
+            conn.execute("ROLLBACK")
+            return _tool_error(server, tool_name, "Transactions cannot span tool calls; the open transaction was rolled back")
+        return result
+    
     def initialize_database(self):
         """Initialize the MCP database if it doesn't exist"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            # Create tables if they don't exist
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS servers (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    name TEXT UNIQUE NOT NULL,
-                    uri TEXT NOT NULL,
-                    enabled BOOLEAN DEFAULT 1,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
+            with closing(open_connection(self.db_path)) as conn, conn, closing(conn.cursor()) as cursor:
+                # Create tables if they don't exist
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS servers (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        name TEXT UNIQUE NOT NULL,
+                        uri TEXT NOT NULL,
+                        enabled BOOLEAN DEFAULT 1,
+                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    )
+                ''')
             
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS tools (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    server_name TEXT NOT NULL,
-                    name TEXT NOT NULL,
-                    description TEXT,
-                    parameters TEXT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (server_name) REFERENCES servers (name)
-                )
-            ''')
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS tools (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        server_name TEXT NOT NULL,
+                        name TEXT NOT NULL,
+                        description TEXT,
+                        parameters TEXT,
+                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        FOREIGN KEY (server_name) REFERENCES servers (name)
+                    )
+                ''')
             
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS resources (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    server_name TEXT NOT NULL,
-                    name TEXT NOT NULL,
-                    uri TEXT NOT NULL,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (server_name) REFERENCES servers (name)
-                )
-            ''')
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS resources (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        server_name TEXT NOT NULL,
+                        name TEXT NOT NULL,
+                        uri TEXT NOT NULL,
+                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        FOREIGN KEY (server_name) REFERENCES servers (name)
+                    )
+                ''')
             
-            conn.commit()
-            conn.close()
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS memory (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        key TEXT UNIQUE NOT NULL,
+                        value TEXT NOT NULL,
+                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    )
+                ''')
             
         except Exception as e:
             print(f"Database initialization failed: {e}")
@@ -76,17 +459,13 @@ class MCPExecutor:
             server_name = tool_info['server_name']
             
             # Route to appropriate executor based on server
-            if server_name == 'sqlite':
-                return await self.execute_sqlite_tool(tool_name, arguments)
-            elif server_name == 'filesystem':
-                return await self.execute_filesystem_tool(tool_name, arguments)
-            elif server_name == 'memory':
-                return await self.execute_memory_tool(tool_name, arguments)
-            else:
+            server_executor = self._server_executors.get(server_name)
+            if server_executor is None:
                 return {
                     "error": f"Unknown server type: {server_name}",
                     "success": False
                 }
+            return await server_executor(tool_name, arguments)
                 
         except Exception as e:
             return {
@@ -94,27 +473,189 @@ class MCPExecutor:
                 "success": False
             }
     
+    async def execute_tools_from_response(
+        self,
+        response_content: str,
+        speculative: Optional[Dict[str, Awaitable[Dict[str, Any]]]] = None
+    ) -> List[Dict[str, Any]]:
+        """Execute every TOOL_EXECUTE request in an LLM response
+        
+        Replies often chain calls (write a file, then read it back), so a
+        write runs only after every request before it has finished, and the
+        requests after it wait for it. Reads between two writes run
+        concurrently. Requests whose tool_call_key is in speculative reuse
+        that already started execution instead of running the tool again,
+        unless a write in this response comes before them. Consecutive writes
+        to the MCP database share one transaction.
+        """
+        # Most responses carry no tool calls; one substring search settles
+        # that without scanning for payloads
+        if _TOOL_MARKER not in response_content:
+            return []
+        
+        # Each stage runs after the previous one has finished; the calls in
+        # a stage run concurrently
+        stages: List[List[Awaitable[Any]]] = []
+        reads = []
+        write_run = []
+        
+        def flush_reads():
+            if reads:
+                stages.append(list(reads))
+                reads.clear()
+        
+        def flush_writes():
+            if len(write_run) > 1:
+                stages.append([self._run_in_pool(self._run_write_batch, list(write_run))])
+            elif write_run:
+                _, tool_name, arguments = write_run[0]
+                stages.append([self.execute_tool(tool_name, arguments)])
+            write_run.clear()
+        
+        for payload in _tool_payloads(response_content):
+            try:
+                tool_name, arguments = _parse_tool_request(payload)
+                
+                write_server = self._write_server(tool_name, arguments)
+                if write_server:
+                    flush_reads()
+                    write_run.append((write_server, tool_name, arguments))
+                    continue
+                flush_writes()
+                
+                if self._is_write_call(tool_name, arguments):
+                    flush_reads()
+                    stages.append([self.execute_tool(tool_name, arguments)])
+                    continue
+                
+                key = self.tool_call_key(tool_name, arguments)
+                if speculative and not stages and key in speculative:
+                    reads.append(speculative.pop(key))
+                else:
+                    reads.append(self.execute_tool(tool_name, arguments))
+            except (ValueError, KeyError, TypeError, AttributeError, *_TOOL_REQUEST_ERRORS) as e:
+                flush_writes()
+                reads.append(self._invalid_tool_request(payload, e))
+        flush_writes()
+        flush_reads()
+        
+        # Stages hold consecutive requests, so results come back in request
+        # order; a write batch yields a list of results, flattened in place
+        results = []
+        index = -1
+        try:
+            for index, stage in enumerate(stages):
+                for result in await asyncio.gather(*stage):
+                    if isinstance(result, list):
+                        results.extend(result)
+                    else:
+                        results.append(result)
+        finally:
+            # Stages that never started (the caller was cancelled) hold
+            # coroutines never awaited and speculative tasks nobody collects
+            for stage in stages[index + 1:]:
+                for call in stage:
+                    if asyncio.iscoroutine(call):
+                        call.close()
+                    elif asyncio.isfuture(call):
+                        call.cancel()
+        return results
+    
+    def _write_server(self, tool_name: str, arguments: Dict[str, Any]) -> Optional[str]:
+        """Return the server of a tool call that writes to the MCP database, else None
+        
+        PRAGMAs are left out: those that set connection state or the journal
+        mode are no-ops or errors inside the batch's transaction.
+        """
+        query = arguments.get('query', '')
+        if tool_name == 'store_memory' or (
+            tool_name == 'query_database' and not _is_read_query(query) and not _is_pragma(query)
+        ):
+            tool_info = self.get_tool_info(tool_name)
+            if tool_info and tool_info['server_name'] in ('sqlite', 'memory'):
+                return tool_info['server_name']
+        return None
+    
+    def _is_write_call(self, tool_name: str, arguments: Dict[str, Any]) -> bool:
+        """Return True if a tool call may change a file or the MCP database"""
+        if tool_name in ('write_file', 'store_memory'):
+            return True
+        return tool_name == 'query_database' and not _is_read_query(arguments.get('query', ''))
+    
+    def _run_write_batch(self, requests: List[tuple]) -> List[Dict[str, Any]]:
+        """Run consecutive write tool calls in one transaction (blocking, runs in a worker thread)
+        
+        Each tool still reports its own failure; a failed statement is undone
+        on its own without aborting the rest of the batch.
+        """
+        runners = {'sqlite': self._run_sqlite_tool, 'memory': self._run_memory_tool}
+        conn = self._get_connection()
+        
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+        except sqlite3.Error as e:
+            # Lock timeout or a transaction already open: none of the calls ran
+            return [
+                _tool_error(server, tool_name, f"Could not start transaction: {e}")
+                for server, tool_name, _ in requests
+            ]
+        try:
+            results = [runners[server](tool_name, arguments) for server, tool_name, arguments in requests]
+        except BaseException:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        
+        # A batched statement may already have ended the transaction: a
+        # user COMMIT or ROLLBACK, or an error SQLite aborts it on
+        if conn.in_transaction:
+            try:
+                conn.execute("COMMIT")
+            except sqlite3.Error as e:
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+                # The writes that reported success were rolled back with it
+                results = [
+                    _tool_error(server, tool_name, f"Transaction commit failed: {e}") if result.get("success") else result
+                    for (server, tool_name, _), result in zip(requests, results)
+                ]
+        return results
+    
+    @staticmethod
+    def parse_tool_requests(text: str) -> List[Tuple[str, Dict[str, Any]]]:
+        """Return the (tool name, arguments) of each well-formed TOOL_EXECUTE request in text"""
+        requests = []
+        for payload in _tool_payloads(text):
+            try:
+                requests.append(_parse_tool_request(payload))
+            except (ValueError, KeyError, TypeError, AttributeError, *_TOOL_REQUEST_ERRORS):
+                continue
+        return requests
+    
+    @staticmethod
+    def tool_call_key(tool_name: str, arguments: Dict[str, Any]) -> str:
+        """Identify a tool call independently of argument order"""
+        return f"{tool_name}:{json.dumps(arguments, sort_keys=True, default=str)}"
+    
+    async def _invalid_tool_request(self, payload: str, error: Exception) -> Dict[str, Any]:
+        """Result for a TOOL_EXECUTE payload that could not be parsed"""
+        return {
+            "error": f"Invalid tool request '{payload}': {error}",
+            "success": False
+        }
+    
     def get_tool_info(self, tool_name: str) -> Optional[Dict[str, Any]]:
         """Get information about a specific tool"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute('''
-                SELECT name, server_name, description, parameters
-                FROM tools
-                WHERE name = ?
-            ''', (tool_name,))
-            
-            result = cursor.fetchone()
-            conn.close()
-            
-            if result:
+            # The catalog snapshot already holds decoded parameters, so a
+            # lookup is a dict get rather than a query and a json.loads
+            tool = get_mcp_metadata().tools_by_name.get(tool_name)
+            if tool:
                 return {
-                    'name': result[0],
-                    'server_name': result[1],
-                    'description': result[2],
-                    'parameters': json.loads(result[3]) if result[3] else {}
+                    'name': tool[1],
+                    'server_name': tool[0],
+                    'description': tool[2],
+                    'parameters': tool[3]
                 }
             return None
             
@@ -124,282 +665,234 @@ class MCPExecutor:
     
     async def execute_sqlite_tool(self, tool_name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
         """Execute SQLite database tools"""
+        return await self._run_in_pool(self._run_standalone, self._run_sqlite_tool, "sqlite", tool_name, arguments)
+    
+    def _run_sqlite_tool(self, tool_name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        """Execute SQLite database tools (blocking, runs in a worker thread)"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            if tool_name == "query_database":
-                query = arguments.get("query", "")
-                cursor.execute(query)
-                
-                if query.strip().upper().startswith("SELECT"):
-                    results = cursor.fetchall()
-                    columns = [description[0] for description in cursor.description]
-                    return {
-                        "server": "sqlite",
-                        "tool": tool_name,
-                        "result": {
-                            "columns": columns,
-                            "rows": results,
-                            "row_count": len(results)
-                        },
-                        "success": True
-                    }
-                else:
-                    conn.commit()
-                    return {
-                        "server": "sqlite",
-                        "tool": tool_name,
-                        "result": f"Query executed successfully. Rows affected: {cursor.rowcount}",
-                        "success": True
-                    }
+            handler = self._sqlite_tools.get(tool_name)
+            if handler is None:
+                return _unknown_tool("sqlite", tool_name)
+            return handler(self._get_cursor(), arguments)
             
-            elif tool_name == "list_tables":
-                cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
-                tables = cursor.fetchall()
-                table_names = [table[0] for table in tables]
-                return {
-                    "server": "sqlite",
-                    "tool": tool_name,
-                    "result": {
-                        "tables": table_names,
-                        "count": len(table_names)
-                    },
-                    "success": True
-                }
-            
-            elif tool_name == "describe_table":
-                table_name = arguments.get("table_name", "")
-                cursor.execute(f"PRAGMA table_info({table_name})")
-                columns = cursor.fetchall()
-                
-                schema = {
-                    "table": table_name,
-                    "columns": [
-                        {
-                            "name": col[1],
-                            "type": col[2],
-                            "not_null": bool(col[3]),
-                            "primary_key": bool(col[5])
-                        }
-                        for col in columns
-                    ]
-                }
-                return {
-                    "server": "sqlite",
-                    "tool": tool_name,
-                    "result": schema,
-                    "success": True
-                }
-            
-            elif tool_name == "get_table_data":
-                table_name = arguments.get("table_name", "")
-                limit = arguments.get("limit", 10)
-                
-                cursor.execute(f"SELECT * FROM {table_name} LIMIT ?", (limit,))
-                results = cursor.fetchall()
-                columns = [description[0] for description in cursor.description]
-                
-                data = {
-                    "table": table_name,
-                    "columns": columns,
-                    "rows": results,
-                    "row_count": len(results)
-                }
-                return {
-                    "server": "sqlite",
-                    "tool": tool_name,
-                    "result": data,
-                    "success": True
-                }
-            
-            else:
-                return {
-                    "server": "sqlite",
-                    "tool": tool_name,
-                    "result": f"Unknown tool: {tool_name}",
-                    "success": False
-                }
-                
         except Exception as e:
-            return {
-                "server": "sqlite",
-                "tool": tool_name,
-                "error": f"SQLite tool execution failed: {e}",
-                "success": False
-            }
-        finally:
-            conn.close()
+            return _tool_error("sqlite", tool_name, f"SQLite tool execution failed: {e}")
+    
+    def _query_database(self, cursor: sqlite3.Cursor, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        """Run an SQL statement, returning at most limit rows for reads"""
+        query = arguments.get("query", "")
+        limit = int(arguments.get("limit", QUERY_ROW_LIMIT))
+        
+        # A read cut off at limit is left part-read, so it gets a throwaway
+        # cursor instead of holding the shared one's snapshot
+        cursor = cursor.connection.cursor()
+        cursor.execute(query)
+        
+        # Whether rows came back is the statement's own answer; the prefix
+        # cannot tell (PRAGMA foreign_keys=ON, WITH ... INSERT). Autocommit
+        # connection: a write commits as it completes.
+        if cursor.description is None:
+            return _tool_result(
+                "sqlite", "query_database", f"Query executed successfully. Rows affected: {cursor.rowcount}"
+            )
+        
+        # SQLite steps rows lazily, so the unread tail is never materialized
+        results = cursor.fetchmany(limit)
+        columns = [description[0] for description in cursor.description]
+        return _tool_result("sqlite", "query_database", {
+            "columns": columns,
+            "rows": results,
+            "row_count": len(results),
+            "truncated": cursor.fetchone() is not None
+        })
+    
+    def _list_tables(self, cursor: sqlite3.Cursor, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        """List the tables in the MCP database"""
+        cursor.execute(_SQL_LIST_TABLES)
+        table_names = [table[0] for table in cursor]
+        return _tool_result("sqlite", "list_tables", {
+            "tables": table_names,
+            "count": len(table_names)
+        })
+    
+    def _describe_table(self, cursor: sqlite3.Cursor, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        """Describe a table's columns from the cached schema"""
+        table_name = arguments.get("table_name", "")
+        
+        # Columns are tuples laid out as "fields", the cached schema
+        # rows as-is, rather than one dict per column
+        schema = {
+            "table": table_name,
+            "fields": _TABLE_SCHEMA_FIELDS,
+            "columns": self._table_schema(table_name)
+        }
+        return _tool_result("sqlite", "describe_table", schema)
+    
+    def _get_table_data(self, cursor: sqlite3.Cursor, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        """Read up to limit rows of a table, optionally projecting columns"""
+        table_name = arguments.get("table_name", "")
+        limit = arguments.get("limit", 10)
+        
+        # Identifiers cannot be bound, so only interpolate names that
+        # the table's own schema lists, and quote them. A missing
+        # table has no columns.
+        table_columns = [column[0] for column in self._table_schema(table_name)]
+        if not table_columns:
+            return _tool_error("sqlite", "get_table_data", f"Table not found: {table_name}")
+        
+        columns = arguments.get("columns")
+        if columns:
+            # Hash lookups rather than a scan of the schema per column
+            known = set(table_columns)
+            unknown = [column for column in columns if column not in known]
+            if unknown:
+                return _tool_error(
+                    "sqlite", "get_table_data", f"Unknown columns for {table_name}: {', '.join(map(str, unknown))}"
+                )
+        else:
+            columns = table_columns
+        
+        # Project only the requested columns instead of SELECT *
+        projection = ", ".join(_quote_identifier(column) for column in columns)
+        cursor.execute(f"SELECT {projection} FROM {_quote_identifier(table_name)} LIMIT ?", (limit,))
+        results = cursor.fetchall()
+        
+        data = {
+            "table": table_name,
+            "columns": columns,
+            "row_count": len(results)
+        }
+        if arguments.get("layout") == "columnar":
+            # One list per column instead of one tuple per row
+            data["columnar"] = [list(values) for values in zip(*results)] or [[] for _ in columns]
+        else:
+            data["rows"] = results
+        return _tool_result("sqlite", "get_table_data", data)
     
     async def execute_filesystem_tool(self, tool_name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
         """Execute filesystem tools"""
+        return await self._run_in_pool(self._run_filesystem_tool, tool_name, arguments)
+    
+    def _run_filesystem_tool(self, tool_name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        """Execute filesystem tools (blocking, runs in a worker thread)"""
         try:
-            if tool_name == "read_file":
-                path = arguments.get("path", "")
-                with open(path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                return {
-                    "server": "filesystem",
-                    "tool": tool_name,
-                    "result": content,
-                    "success": True
-                }
-            
-            elif tool_name == "write_file":
-                path = arguments.get("path", "")
-                content = arguments.get("content", "")
-                with open(path, 'w', encoding='utf-8') as f:
-                    f.write(content)
-                return {
-                    "server": "filesystem",
-                    "tool": tool_name,
-                    "result": f"File written successfully: {path}",
-                    "success": True
-                }
-            
-            elif tool_name == "list_directory":
-                path = arguments.get("path", "")
-                items = os.listdir(path)
-                return {
-                    "server": "filesystem",
-                    "tool": tool_name,
-                    "result": items,
-                    "success": True
-                }
-            
-            else:
-                return {
-                    "server": "filesystem",
-                    "tool": tool_name,
-                    "result": f"Unknown tool: {tool_name}",
-                    "success": False
-                }
+            handler = self._filesystem_tools.get(tool_name)
+            if handler is None:
+                return _unknown_tool("filesystem", tool_name)
+            return handler(arguments)
                 
         except Exception as e:
-            return {
-                "server": "filesystem",
-                "tool": tool_name,
-                "error": f"Filesystem tool execution failed: {e}",
-                "success": False
-            }
+            return _tool_error("filesystem", tool_name, f"Filesystem tool execution failed: {e}")
+    
+    def _read_file(self, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        """Read one window of a UTF-8 file"""
+        path = _resolve_path(arguments.get("path", ""))
+        offset = int(arguments.get("offset", 0))
+        max_bytes = int(arguments.get("max_bytes", READ_FILE_CHUNK))
+        # Read one byte past the window to learn whether more follows
+        data = _read_bytes(path, offset, max_bytes + 1)
+        truncated = len(data) > max_bytes
+        # An incremental decoder holds back a UTF-8 sequence split by
+        # the window edge; the next window starts at those bytes. Bytes that
+        # are not UTF-8 at all become U+FFFD instead of failing the read.
+        decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        content = decoder.decode(data[:max_bytes], final=not truncated)
+        response = _tool_result("filesystem", "read_file", content, truncated=truncated)
+        if truncated:
+            response["next_offset"] = offset + max_bytes - len(decoder.getstate()[0])
+        return response
+    
+    def _write_file(self, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        """Write a UTF-8 file, replacing any existing content"""
+        path = _resolve_path(arguments.get("path", ""))
+        content = arguments.get("content", "")
+        _write_bytes(path, content.encode('utf-8'))
+        return _tool_result("filesystem", "write_file", f"File written successfully: {path}")
+    
+    def _list_directory(self, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        """List a directory's entries with their type and size"""
+        path = _resolve_path(arguments.get("path", ""))
+        # scandir reads each entry's type along with its name, so only
+        # non-directories need a stat() call for their size. Symlinks are
+        # not followed, so a dangling link cannot fail the whole listing.
+        items = []
+        with os.scandir(path) as entries:
+            for entry in entries:
+                is_dir = entry.is_dir(follow_symlinks=False)
+                items.append({
+                    "name": entry.name,
+                    "is_dir": is_dir,
+                    "size": None if is_dir else entry.stat(follow_symlinks=False).st_size
+                })
+        return _tool_result("filesystem", "list_directory", items)
     
     async def execute_memory_tool(self, tool_name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
         """Execute memory tools"""
+        return await self._run_in_pool(self._run_standalone, self._run_memory_tool, "memory", tool_name, arguments)
+    
+    def _run_memory_tool(self, tool_name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        """Execute memory tools (blocking, runs in a worker thread)"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            # Create memory table if it doesn't exist
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS memory (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    key TEXT UNIQUE NOT NULL,
-                    value TEXT NOT NULL,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
-            
-            if tool_name == "store_memory":
-                key = arguments.get("key", "")
-                value = arguments.get("value", "")
-                
-                cursor.execute('''
-                    INSERT OR REPLACE INTO memory (key, value, updated_at)
-                    VALUES (?, ?, CURRENT_TIMESTAMP)
-                ''', (key, value))
-                conn.commit()
-                
-                return {
-                    "server": "memory",
-                    "tool": tool_name,
-                    "result": f"Memory stored: {key}",
-                    "success": True
-                }
-            
-            elif tool_name == "retrieve_memory":
-                key = arguments.get("key", "")
-                cursor.execute("SELECT value FROM memory WHERE key = ?", (key,))
-                result = cursor.fetchone()
-                
-                if result:
-                    return {
-                        "server": "memory",
-                        "tool": tool_name,
-                        "result": result[0],
-                        "success": True
-                    }
-                else:
-                    return {
-                        "server": "memory",
-                        "tool": tool_name,
-                        "result": None,
-                        "success": True
-                    }
-            
-            elif tool_name == "list_memories":
-                cursor.execute("SELECT key, value, created_at FROM memory ORDER BY created_at DESC")
-                memories = cursor.fetchall()
-                
-                result = [
-                    {
-                        "key": mem[0],
-                        "value": mem[1],
-                        "created_at": mem[2]
-                    }
-                    for mem in memories
-                ]
-                
-                return {
-                    "server": "memory",
-                    "tool": tool_name,
-                    "result": result,
-                    "success": True
-                }
-            
-            else:
-                return {
-                    "server": "memory",
-                    "tool": tool_name,
-                    "result": f"Unknown tool: {tool_name}",
-                    "success": False
-                }
+            handler = self._memory_tools.get(tool_name)
+            if handler is None:
+                return _unknown_tool("memory", tool_name)
+            return handler(self._get_cursor(), arguments)
                 
         except Exception as e:
-            return {
-                "server": "memory",
-                "tool": tool_name,
-                "error": f"Memory tool execution failed: {e}",
-                "success": False
+            return _tool_error("memory", tool_name, f"Memory tool execution failed: {e}")
+    
+    def _store_memory(self, cursor: sqlite3.Cursor, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        """Store a value under a key, replacing any previous value"""
+        key = arguments.get("key", "")
+        value = arguments.get("value", "")
+        
+        cursor.execute(_SQL_UPSERT_MEMORY, (key, value))
+        
+        return _tool_result("memory", "store_memory", f"Memory stored: {key}")
+    
+    def _retrieve_memory(self, cursor: sqlite3.Cursor, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        """Look up the value stored under a key"""
+        cursor.execute(_SQL_SELECT_MEMORY, (arguments.get("key", ""),))
+        result = cursor.fetchone()
+        
+        return _tool_result("memory", "retrieve_memory", result[0] if result else None)
+    
+    def _list_memories(self, cursor: sqlite3.Cursor, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        """List stored memories, newest first"""
+        limit = arguments.get("limit")
+        if limit is None:
+            cursor.execute(_SQL_LIST_MEMORIES)
+        else:
+            cursor.execute(_SQL_LIST_MEMORIES_LIMIT, (int(limit),))
+        
+        # Iterate the cursor directly rather than buffering a fetchall() copy
+        result = [
+            {
+                "key": key,
+                "value": value,
+                "created_at": created_at
             }
-        finally:
-            conn.close()
+            for key, value, created_at in cursor
+        ]
+        
+        return _tool_result("memory", "list_memories", result)
     
     def get_available_tools(self) -> List[Dict[str, Any]]:
         """Get list of all available tools"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute('''
-                SELECT t.name, t.description, t.parameters, s.name as server_name, s.enabled
-                FROM tools t
-                JOIN servers s ON t.server_name = s.name
-                ORDER BY s.name, t.name
-            ''')
-            
-            tools = cursor.fetchall()
-            conn.close()
+            metadata = get_mcp_metadata()
+            server_enabled = {name: enabled for name, _, enabled in metadata.servers}
             
             return [
                 {
-                    "name": tool[0],
-                    "description": tool[1],
-                    "parameters": json.loads(tool[2]) if tool[2] else {},
-                    "server": tool[3],
-                    "enabled": bool(tool[4])
+                    "name": name,
+                    "description": description,
+                    "parameters": parameters,
+                    "server": server_name,
+                    "enabled": server_enabled[server_name]
                 }
-                for tool in tools
+                for server_name, name, description, parameters, _ in metadata.tools
+                if server_name in server_enabled
             ]
             
         except Exception as e:
@@ -409,18 +902,13 @@ class MCPExecutor:
     def get_available_resources(self) -> List[Dict[str, Any]]:
         """Get list of all available resources"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute('''
-                SELECT r.name, r.uri, s.name as server_name, s.enabled
-                FROM resources r
-                JOIN servers s ON r.server_name = s.name
-                ORDER BY s.name, r.name
-            ''')
-            
-            resources = cursor.fetchall()
-            conn.close()
+            with closing(open_connection(self.db_path)) as conn:
+                resources = conn.execute('''
+                    SELECT r.name, r.uri, s.name as server_name, s.enabled
+                    FROM resources r
+                    JOIN servers s ON r.server_name = s.name
+                    ORDER BY s.name, r.name
+                ''').fetchall()
             
             return [
                 {
@@ -435,3 +923,8 @@ class MCPExecutor:
         except Exception as e:
             print(f"Error getting available resources: {e}")
             return []
+
+@lru_cache(maxsize=1)
+def get_mcp_executor() -> MCPExecutor:
+    """Get the shared executor, created on first use so importing stays side-effect free"""
+    return MCPExecutor()
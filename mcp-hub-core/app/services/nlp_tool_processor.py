@@ -4,10 +4,92 @@ Converts natural language queries into tool executions
 """
 
 import re
-import json
 from typing import Dict, List, Any, Optional, Tuple
-from datetime import datetime
-import sqlite3
+
+# Per-tool lookup tables, built once at import instead of on every call
+
+# Parameters each tool needs before it can run
+_REQUIRED_PARAMETERS: Dict[str, Tuple[str, ...]] = {
+    'list_directory': ('path',),
+    'read_file': ('path',),
+    'write_file': ('path', 'content'),
+    'list_tables': (),
+    'query_database': ('query',),
+    'describe_table': ('table_name',),
+    'store_memory': ('key', 'value'),
+    'retrieve_memory': ('key',),
+    'list_memories': ()
+}
+
+# Hint shown for each parameter the query did not supply
+_PARAMETER_SUGGESTIONS: Dict[str, str] = {
+    'path': "Specify a file path, e.g., '/path/to/file.txt'",
+    'content': "Provide the content to write",
+    'query': "Provide a SQL query, e.g., 'SELECT * FROM users'",
+    'table_name': "Specify a table name",
+    'key': "Provide a key name for storage",
+    'value': "Provide the value to store"
+}
+
+_TOOL_DESCRIPTIONS: Dict[str, str] = {
+    'list_directory': 'List files in a directory',
+    'read_file': 'Read contents of a file',
+    'write_file': 'Write content to a file',
+    'list_tables': 'List database tables',
+    'query_database': 'Execute SQL queries',
+    'describe_table': 'Get table structure',
+    'store_memory': 'Store information in memory',
+    'retrieve_memory': 'Retrieve stored information',
+    'list_memories': 'List all stored memories'
+}
+
+_TOOL_EXAMPLES: Dict[str, Tuple[str, ...]] = {
+    'list_directory': (
+        'List files in /home/user',
+        'Show contents of documents folder',
+        'What files are in the current directory?'
+    ),
+    'read_file': (
+        'Read the file config.txt',
+        'Show content of readme.md',
+        'Open the file /path/to/data.json'
+    ),
+    'write_file': (
+        'Write "Hello World" to greeting.txt',
+        'Create a file notes.txt with my notes',
+        'Save data to output.csv'
+    ),
+    'list_tables': (
+        'List all tables in the database',
+        'Show database tables',
+        'What tables are available?'
+    ),
+    'query_database': (
+        'Query: SELECT * FROM users',
+        'Find all records in the products table',
+        'Run SQL: SELECT COUNT(*) FROM orders'
+    ),
+    'describe_table': (
+        'Describe the users table',
+        'Show structure of products table',
+        'What columns are in the orders table?'
+    ),
+    'store_memory': (
+        'Remember that John likes pizza',
+        'Store the API key as "api_key"',
+        'Save my preferences as "user_prefs"'
+    ),
+    'retrieve_memory': (
+        'Get the stored API key',
+        'Retrieve user preferences',
+        'What did I remember about John?'
+    ),
+    'list_memories': (
+        'List all stored memories',
+        'Show what I have stored',
+        'What information is saved?'
+    )
+}
 
 class NLPToolProcessor:
     """Processes natural language queries and converts them to tool executions"""
@@ -208,20 +290,9 @@ class NLPToolProcessor:
         
         return parameters
     
-    def _get_required_parameters(self, tool: str) -> List[str]:
+    def _get_required_parameters(self, tool: str) -> Tuple[str, ...]:
         """Get required parameters for a tool"""
-        param_map = {
-            'list_directory': ['path'],
-            'read_file': ['path'],
-            'write_file': ['path', 'content'],
-            'list_tables': [],
-            'query_database': ['query'],
-            'describe_table': ['table_name'],
-            'store_memory': ['key', 'value'],
-            'retrieve_memory': ['key'],
-            'list_memories': []
-        }
-        return param_map.get(tool, [])
+        return _REQUIRED_PARAMETERS.get(tool, ())
     
     def _validate_parameters(self, tool: str, parameters: Dict[str, Any]) -> Dict[str, Any]:
         """Validate that all required parameters are present"""
@@ -267,39 +338,11 @@ class NLPToolProcessor:
     
     def _get_parameter_suggestions(self, tool: str) -> List[str]:
         """Get suggestions for missing parameters"""
-        suggestions = []
-        required = self._get_required_parameters(tool)
-        
-        for param in required:
-            if param == 'path':
-                suggestions.append("Specify a file path, e.g., '/path/to/file.txt'")
-            elif param == 'content':
-                suggestions.append("Provide the content to write")
-            elif param == 'query':
-                suggestions.append("Provide a SQL query, e.g., 'SELECT * FROM users'")
-            elif param == 'table_name':
-                suggestions.append("Specify a table name")
-            elif param == 'key':
-                suggestions.append("Provide a key name for storage")
-            elif param == 'value':
-                suggestions.append("Provide the value to store")
-        
-        return suggestions
+        return [_PARAMETER_SUGGESTIONS[param] for param in self._get_required_parameters(tool)]
     
     def _get_tool_description(self, tool: str) -> str:
         """Get human-readable description of a tool"""
-        descriptions = {
-            'list_directory': 'List files in a directory',
-            'read_file': 'Read contents of a file',
-            'write_file': 'Write content to a file',
-            'list_tables': 'List database tables',
-            'query_database': 'Execute SQL queries',
-            'describe_table': 'Get table structure',
-            'store_memory': 'Store information in memory',
-            'retrieve_memory': 'Retrieve stored information',
-            'list_memories': 'List all stored memories'
-        }
-        return descriptions.get(tool, tool)
+        return _TOOL_DESCRIPTIONS.get(tool, tool)
     
     def get_available_commands(self) -> List[Dict[str, Any]]:
         """Get list of available natural language commands"""
@@ -310,58 +353,14 @@ class NLPToolProcessor:
                 'tool': tool,
                 'description': self._get_tool_description(tool),
                 'examples': self._get_examples(tool),
-                'required_parameters': self._get_required_parameters(tool)
+                'required_parameters': list(self._get_required_parameters(tool))
             })
         
         return commands
     
     def _get_examples(self, tool: str) -> List[str]:
         """Get example queries for a tool"""
-        examples = {
-            'list_directory': [
-                'List files in /home/user',
-                'Show contents of documents folder',
-                'What files are in the current directory?'
-            ],
-            'read_file': [
-                'Read the file config.txt',
-                'Show content of readme.md',
-                'Open the file /path/to/data.json'
-            ],
-            'write_file': [
-                'Write "Hello World" to greeting.txt',
-                'Create a file notes.txt with my notes',
-                'Save data to output.csv'
-            ],
-            'list_tables': [
-                'List all tables in the database',
-                'Show database tables',
-                'What tables are available?'
-            ],
-            'query_database': [
-                'Query: SELECT * FROM users',
-                'Find all records in the products table',
-                'Run SQL: SELECT COUNT(*) FROM orders'
-            ],
-            'describe_table': [
-                'Describe the users table',
-                'Show structure of products table',
-                'What columns are in the orders table?'
-            ],
-            'store_memory': [
-                'Remember that John likes pizza',
-                'Store the API key as "api_key"',
-                'Save my preferences as "user_prefs"'
-            ],
-            'retrieve_memory': [
-                'Get the stored API key',
-                'Retrieve user preferences',
-                'What did I remember about John?'
-            ],
-            'list_memories': [
-                'List all stored memories',
-                'Show what I have stored',
-                'What information is saved?'
-            ]
-        }
-        return examples.get(tool, [])
+        return list(_TOOL_EXAMPLES.get(tool, ()))
+
+# Global instance
+nlp_processor = NLPToolProcessor()
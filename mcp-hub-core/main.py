@@ -6,23 +6,18 @@ FastAPI backend for MCP Hub
 
 from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse
 import uvicorn
-import os
 import json
-import sqlite3
 from datetime import datetime
-from typing import List, Dict, Any, Optional
-import asyncio
+from typing import List, Dict, Any
 
 # Import MCP Hub modules
 from app.api import tools, chat, resources, auth, databases
 from app.core.config import settings
-from app.core.database import init_db
+from app.core.database import get_mcp_metadata, init_db
 from app.core.multi_database_manager import multi_db_manager, DatabaseConfig, DatabaseType
-from app.services.llm_manager import LLMManager
-from app.services.mcp_executor import MCPExecutor
+from app.services.llm_manager import llm_manager as shared_llm_manager
+from app.services.mcp_executor import get_mcp_executor
 from app.services.database_chat_service import database_chat_service
 
 # Create FastAPI app
@@ -63,16 +58,13 @@ async def startup_event():
     # Initialize database
     init_db()
     
-    # Initialize LLM manager
-    try:
-        llm_manager = LLMManager()
-        print("✅ LLM Manager initialized")
-    except Exception as e:
-        print(f"⚠️ LLM Manager initialization failed: {e}")
+    # Use the process-wide LLM manager instead of initializing a second one
+    llm_manager = shared_llm_manager
+    print("✅ LLM Manager initialized")
     
     # Initialize MCP executor
     try:
-        mcp_executor = MCPExecutor()
+        mcp_executor = get_mcp_executor()
         print("✅ MCP Executor initialized")
     except Exception as e:
         print(f"⚠️ MCP Executor initialization failed: {e}")
@@ -137,30 +129,47 @@ async def health_check():
 async def get_status():
     """Get system status"""
     try:
-        # Get tools count
-        conn = sqlite3.connect('mcp.db')
-        cursor = conn.cursor()
-        cursor.execute("SELECT COUNT(*) FROM tools")
-        tools_count = cursor.fetchone()[0]
-        
-        cursor.execute("SELECT COUNT(*) FROM servers WHERE enabled = 1")
-        servers_count = cursor.fetchone()[0]
-        
-        cursor.execute("SELECT COUNT(*) FROM resources")
-        resources_count = cursor.fetchone()[0]
-        
-        conn.close()
+        # Counts come from the cached catalog, so a status poll costs no
+        # queries until the database changes
+        metadata = get_mcp_metadata()
         
         return {
-            "tools": tools_count,
-            "servers": servers_count,
-            "resources": resources_count,
+            "tools": len(metadata.tools),
+            "servers": sum(1 for _, _, enabled in metadata.servers if enabled),
+            "resources": len(metadata.resources),
             "llm_providers": len(llm_manager.list_available_providers()) if llm_manager else 0,
             "timestamp": datetime.now().isoformat()
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get status: {e}")
 
+async def handle_chat_message(message: Dict[str, Any]) -> Dict[str, Any]:
+    """Handle a websocket chat message"""
+    response = await process_chat_message(message.get("content", ""))
+    return {
+        "type": "chat_response",
+        "content": response,
+        "timestamp": datetime.now().isoformat()
+    }
+
+async def handle_tool_execute_message(message: Dict[str, Any]) -> Dict[str, Any]:
+    """Handle a websocket tool execution message"""
+    result = await execute_tool(
+        message.get("tool_name"),
+        message.get("arguments", {})
+    )
+    return {
+        "type": "tool_result",
+        "result": result,
+        "timestamp": datetime.now().isoformat()
+    }
+
+# Websocket message handlers keyed by message type
+WEBSOCKET_HANDLERS = {
+    "chat": handle_chat_message,
+    "tool_execute": handle_tool_execute_message,
+}
+
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
     """WebSocket endpoint for real-time communication"""
@@ -172,27 +181,10 @@ async def websocket_endpoint(websocket: WebSocket):
             data = await websocket.receive_text()
             message = json.loads(data)
             
-            # Handle different message types
-            if message.get("type") == "chat":
-                # Process chat message
-                response = await process_chat_message(message.get("content", ""))
-                await websocket.send_text(json.dumps({
-                    "type": "chat_response",
-                    "content": response,
-                    "timestamp": datetime.now().isoformat()
-                }))
-            
-            elif message.get("type") == "tool_execute":
-                # Execute tool
-                result = await execute_tool(
-                    message.get("tool_name"),
-                    message.get("arguments", {})
-                )
-                await websocket.send_text(json.dumps({
-                    "type": "tool_result",
-                    "result": result,
-                    "timestamp": datetime.now().isoformat()
-                }))
+            # Dispatch on message type; unknown types are ignored
+            handler = WEBSOCKET_HANDLERS.get(message.get("type"))
+            if handler:
+                await websocket.send_text(json.dumps(await handler(message)))
             
     except WebSocketDisconnect:
         active_connections.remove(websocket)
@@ -213,8 +205,8 @@ async def process_chat_message(content: str) -> str:
             return result.get('response', 'Database query processed')
         
         # Get available tools and resources
-        tools_info = get_tools_info()
-        resources_info = get_resources_info()
+        tools_info = chat.get_tools_info()
+        resources_info = chat.get_resources_info()
         databases_info = get_databases_info()
         
         system_prompt = f"""You are a helpful AI assistant with access to MCP tools, resources, and multiple databases.
@@ -267,40 +259,6 @@ async def execute_tool(tool_name: str, arguments: Dict[str, Any]) -> Dict[str, A
     except Exception as e:
         return {"error": f"Tool execution failed: {e}"}
 
-def get_tools_info() -> str:
-    """Get formatted tools information"""
-    try:
-        conn = sqlite3.connect('mcp.db')
-        cursor = conn.cursor()
-        cursor.execute("SELECT name, description, parameters FROM tools")
-        tools = cursor.fetchall()
-        conn.close()
-        
-        tools_info = []
-        for tool in tools:
-            tools_info.append(f"- {tool[0]}: {tool[1]}")
-        
-        return "\n".join(tools_info)
-    except Exception as e:
-        return f"Error loading tools: {e}"
-
-def get_resources_info() -> str:
-    """Get formatted resources information"""
-    try:
-        conn = sqlite3.connect('mcp.db')
-        cursor = conn.cursor()
-        cursor.execute("SELECT name, uri FROM resources")
-        resources = cursor.fetchall()
-        conn.close()
-        
-        resources_info = []
-        for resource in resources:
-            resources_info.append(f"- {resource[0]}: {resource[1]}")
-        
-        return "\n".join(resources_info)
-    except Exception as e:
-        return f"Error loading resources: {e}"
-
 def get_databases_info() -> str:
     """Get formatted databases information"""
     try:
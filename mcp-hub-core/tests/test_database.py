@@ -0,0 +1,125 @@
+"""Tests for the MCP database helpers."""
+
+import sys
+import threading
+from contextlib import closing
+from pathlib import Path
+
+import pytest
+
+
+# Ensure the application package is importable when tests run from the repo root
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+
+from app.core import database  # noqa: E402  (import after sys.path mutation)
+
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    """Point the database module at a freshly initialized temporary database."""
+
+    path = tmp_path / "mcp.db"
+    monkeypatch.setattr(database, "DB_PATH", str(path))
+    database.init_db()
+    return path
+
+
+def test_mcp_metadata_is_cached_until_the_database_changes(db_path):
+    """Metadata should be served from cache and refreshed after a write."""
+
+    first = database.get_mcp_metadata()
+    assert database.get_mcp_metadata() is first
+    assert ("sqlite", "query_database") in {(tool[0], tool[1]) for tool in first.tools}
+
+    database.execute_update(
+        "INSERT INTO tools (server_name, name, description, parameters) VALUES (?, ?, ?, ?)",
+        ("memory", "forget_memory", "Forget a memory", '{"key": {"type": "string"}}'),
+    )
+
+    refreshed = database.get_mcp_metadata()
+    assert refreshed is not first
+    assert (
+        "memory",
+        "forget_memory",
+        "Forget a memory",
+        {"key": {"type": "string"}},
+        ("key",),
+    ) in refreshed.tools
+
+
+def test_db_version_sees_writes_through_shared_connections(db_path):
+    """Commits through any thread's shared connection should change the version."""
+
+    before = database.get_db_version()
+    assert database.get_db_version() == before
+
+    with database.get_shared_connection() as conn:
+        conn.execute("UPDATE servers SET enabled = 0 WHERE name = 'memory'")
+    after_local = database.get_db_version()
+    assert after_local != before
+
+    def write_from_another_thread():
+        with database.get_shared_connection() as conn:
+            conn.execute("UPDATE servers SET enabled = 1 WHERE name = 'memory'")
+
+    thread = threading.Thread(target=write_from_another_thread)
+    thread.start()
+    thread.join()
+    assert database.get_db_version() != after_local
+
+
+def test_mcp_metadata_indexes_tools_and_resources_by_server(db_path):
+    """Per-server groups should hold exactly that server's tools and resources."""
+
+    metadata = database.get_mcp_metadata()
+
+    assert [tool[1] for tool in metadata.tools_by_server["memory"]] == [
+        "list_memories",
+        "retrieve_memory",
+        "store_memory",
+    ]
+    assert metadata.resources_by_server["sqlite"][0][1] == "mcp_database"
+    assert sum(len(group) for group in metadata.tools_by_server.values()) == len(metadata.tools)
+    assert metadata.tools_by_name["store_memory"][0] == "memory"
+    assert metadata.tools_by_name["query_database"][3]["query"]["required"] is True
+
+
+def test_shared_connection_is_reused_and_rolls_back_failed_writes(db_path):
+    """The shared connection should persist per thread and undo failed writes."""
+
+    conn = database.get_shared_connection()
+    assert database.get_shared_connection() is conn
+
+    with pytest.raises(RuntimeError):
+        with conn:
+            conn.execute("UPDATE servers SET enabled = 0")
+            raise RuntimeError("abort")
+
+    assert conn.execute("SELECT COUNT(*) FROM servers WHERE enabled = 0").fetchone() == (0,)
+
+
+def test_every_connection_gets_the_connection_pragmas(db_path):
+    """Short-lived and shared connections alike should run WAL with synchronous=NORMAL."""
+
+    with closing(database.get_connection()) as conn:
+        assert conn.execute("PRAGMA journal_mode").fetchone() == ("wal",)
+        assert conn.execute("PRAGMA synchronous").fetchone() == (1,)
+
+    assert database.get_shared_connection().execute("PRAGMA synchronous").fetchone() == (1,)
+
+
+def test_tools_by_name_skips_tools_without_a_server(db_path):
+    """A tool whose server row is missing should not be found by name."""
+
+    database.execute_update(
+        "INSERT INTO tools (server_name, name, description, parameters) VALUES (?, ?, ?, ?)",
+        ("ghost", "haunt", "Tool of a deleted server", "{}"),
+    )
+
+    metadata = database.get_mcp_metadata()
+
+    assert "haunt" not in metadata.tools_by_name
+    assert "store_memory" in metadata.tools_by_name
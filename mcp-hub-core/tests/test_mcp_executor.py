@@ -0,0 +1,604 @@
+"""Tests for the MCP tool executor."""
+
+import asyncio
+import os
+import sqlite3
+import sys
+from contextlib import closing
+from pathlib import Path
+
+import pytest
+
+
+# Ensure the application package is importable when tests run from the repo root
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+
+from app.core import database  # noqa: E402  (import after sys.path mutation)
+from app.services.mcp_executor import MCPExecutor  # noqa: E402
+
+
+@pytest.fixture
+def executor(tmp_path, monkeypatch):
+    """An executor whose seeded mcp.db lives in a temporary directory."""
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(database, "DB_PATH", str(tmp_path / "mcp.db"))
+    database.init_db()
+    return MCPExecutor()
+
+
+def test_store_memory_updates_existing_key_in_place(executor, tmp_path):
+    """Re-storing a key should update the value without recreating the row."""
+
+    async def run_test():
+        await executor.execute_memory_tool("store_memory", {"key": "greeting", "value": "hello"})
+        await executor.execute_memory_tool("store_memory", {"key": "greeting", "value": "hi"})
+        return await executor.execute_memory_tool("retrieve_memory", {"key": "greeting"})
+
+    result = asyncio.run(run_test())
+
+    assert result["success"] is True
+    assert result["result"] == "hi"
+
+    with sqlite3.connect(tmp_path / "mcp.db") as conn:
+        rows = conn.execute("SELECT id FROM memory WHERE key = 'greeting'").fetchall()
+    assert rows == [(1,)]
+
+
+def test_execute_tools_from_response_returns_results_in_request_order(executor):
+    """Every TOOL_EXECUTE line should produce one result, in the order it appeared."""
+
+    response = "\n".join([
+        "Let me check that for you.",
+        'TOOL_EXECUTE: {"tool": "store_memory", "arguments": {"key": "a", "value": "1"}}',
+        'TOOL_EXECUTE: {"tool": }',
+        'TOOL_EXECUTE: {"tool": "list_tables", "arguments": {}}',
+    ])
+
+    results = asyncio.run(executor.execute_tools_from_response(response))
+
+    assert len(results) == 3
+    assert results[0]["success"] is True
+    assert results[1]["success"] is False
+    assert results[2]["success"] is True
+
+
+def test_query_database_commits_writes(executor, tmp_path):
+    """Non-SELECT statements should be committed before the tool returns."""
+
+    async def run_test():
+        await executor.execute_sqlite_tool("query_database", {"query": "CREATE TABLE notes (body TEXT)"})
+        return await executor.execute_sqlite_tool(
+            "query_database", {"query": "INSERT INTO notes (body) VALUES ('hello')"}
+        )
+
+    result = asyncio.run(run_test())
+
+    assert result["success"] is True
+    assert result["result"] == "Query executed successfully. Rows affected: 1"
+
+    with sqlite3.connect(tmp_path / "mcp.db") as conn:
+        assert conn.execute("SELECT body FROM notes").fetchall() == [("hello",)]
+
+
+def test_execute_tools_from_response_reuses_speculative_results(executor):
+    """A request matching a speculative call should take its result instead of re-running."""
+
+    async def run_test():
+        speculative_result = {"success": True, "result": "speculated"}
+        future = asyncio.get_running_loop().create_future()
+        future.set_result(speculative_result)
+        speculative = {executor.tool_call_key("list_memories", {}): future}
+
+        results = await executor.execute_tools_from_response(
+            'TOOL_EXECUTE: {"tool": "list_memories", "arguments": {}}',
+            speculative,
+        )
+        return results, speculative_result, speculative
+
+    results, speculative_result, speculative = asyncio.run(run_test())
+
+    assert results == [speculative_result]
+    assert speculative == {}
+
+
+def test_query_database_returns_rows_for_read_only_statements(executor):
+    """CTEs and PRAGMAs produce rows, so they should be reported like a SELECT."""
+
+    async def run_test():
+        return (
+            await executor.execute_sqlite_tool("query_database", {"query": "  with t(x) as (select 1) select x from t"}),
+            await executor.execute_sqlite_tool("query_database", {"query": "PRAGMA user_version"}),
+        )
+
+    cte, pragma = asyncio.run(run_test())
+
+    assert cte["result"]["rows"] == [(1,)]
+    assert pragma["result"]["columns"] == ["user_version"]
+
+
+def test_query_database_caps_rows_and_flags_truncation(executor):
+    """SELECTs should return at most `limit` rows and say whether more were available."""
+
+    query = "WITH RECURSIVE n(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM n WHERE x < 5) SELECT x FROM n"
+
+    async def run_test():
+        return (
+            await executor.execute_sqlite_tool("query_database", {"query": query, "limit": 3}),
+            await executor.execute_sqlite_tool("query_database", {"query": query, "limit": 5}),
+        )
+
+    capped, complete = asyncio.run(run_test())
+
+    assert capped["result"]["rows"] == [(1,), (2,), (3,)]
+    assert capped["result"]["truncated"] is True
+    assert complete["result"]["row_count"] == 5
+    assert complete["result"]["truncated"] is False
+
+
+def test_execute_tools_from_response_batches_consecutive_writes(executor, tmp_path):
+    """Back-to-back writes should run in order and all be committed."""
+
+    response = "\n".join([
+        'TOOL_EXECUTE: {"tool": "store_memory", "arguments": {"key": "a", "value": "1"}}',
+        'TOOL_EXECUTE: {"tool": "store_memory", "arguments": {"key": "a", "value": "2"}}',
+        'TOOL_EXECUTE: {"tool": "store_memory", "arguments": {"key": "b", "value": "3"}}',
+        'TOOL_EXECUTE: {"tool": "retrieve_memory", "arguments": {"key": "a"}}',
+    ])
+
+    results = asyncio.run(executor.execute_tools_from_response(response))
+
+    assert [result["success"] for result in results] == [True, True, True, True]
+
+    with sqlite3.connect(tmp_path / "mcp.db") as conn:
+        rows = conn.execute("SELECT key, value FROM memory ORDER BY key").fetchall()
+    assert rows == [("a", "2"), ("b", "3")]
+
+
+def test_list_memories_honours_limit(executor):
+    """list_memories should return every memory unless a limit is given."""
+
+    async def run_test():
+        for key in ("a", "b", "c"):
+            await executor.execute_memory_tool("store_memory", {"key": key, "value": key.upper()})
+        return (
+            await executor.execute_memory_tool("list_memories", {}),
+            await executor.execute_memory_tool("list_memories", {"limit": 2}),
+        )
+
+    everything, limited = asyncio.run(run_test())
+
+    assert {memory["key"] for memory in everything["result"]} == {"a", "b", "c"}
+    assert len(limited["result"]) == 2
+
+
+def test_table_tools_bind_table_names(executor):
+    """Table names should be bound or validated, never executed as SQL."""
+
+    async def run_test():
+        return (
+            await executor.execute_sqlite_tool("describe_table", {"table_name": "memory"}),
+            await executor.execute_sqlite_tool("get_table_data", {"table_name": "servers", "limit": 1}),
+            await executor.execute_sqlite_tool("get_table_data", {"table_name": "servers; DROP TABLE tools"}),
+            await executor.execute_sqlite_tool("list_tables", {}),
+        )
+
+    described, sample, injected, tables = asyncio.run(run_test())
+
+    columns = [dict(zip(described["result"]["fields"], column)) for column in described["result"]["columns"]]
+    assert [column["name"] for column in columns][:3] == ["id", "key", "value"]
+    assert columns[0]["primary_key"] is True
+    assert sample["result"]["row_count"] == 1
+    assert injected["success"] is False
+    assert "tools" in tables["result"]["tables"]
+
+
+def test_read_file_windows_large_files(executor, tmp_path):
+    """read_file should return bounded windows without splitting UTF-8 characters."""
+
+    path = tmp_path / "notes.txt"
+    path.write_text("abécd", encoding="utf-8")
+
+    async def run_test():
+        first = await executor.execute_filesystem_tool("read_file", {"path": str(path), "max_bytes": 3})
+        rest = await executor.execute_filesystem_tool(
+            "read_file", {"path": str(path), "offset": first["next_offset"], "max_bytes": 4}
+        )
+        return first, rest
+
+    first, rest = asyncio.run(run_test())
+
+    assert first["result"] == "ab"
+    assert first["truncated"] is True
+    assert first["next_offset"] == 2
+    assert rest["result"] == "écd"
+    assert rest["truncated"] is False
+
+
+def test_list_directory_reports_entry_types(executor, tmp_path):
+    """list_directory should describe each entry from a single scandir pass."""
+
+    (tmp_path / "docs").mkdir()
+    (tmp_path / "docs" / "readme.txt").write_text("hello", encoding="utf-8")
+    (tmp_path / "docs" / "nested").mkdir()
+    (tmp_path / "docs" / "dangling").symlink_to(tmp_path / "missing")
+
+    result = asyncio.run(
+        executor.execute_filesystem_tool("list_directory", {"path": str(tmp_path / "docs")})
+    )
+
+    entries = {entry["name"]: entry for entry in result["result"]}
+    assert entries["readme.txt"] == {"name": "readme.txt", "is_dir": False, "size": 5}
+    assert entries["nested"] == {"name": "nested", "is_dir": True, "size": None}
+    assert entries["dangling"]["is_dir"] is False
+
+
+def test_get_table_data_projects_requested_columns(executor):
+    """get_table_data should select only the requested, known columns."""
+
+    async def run_test():
+        return (
+            await executor.execute_sqlite_tool(
+                "get_table_data", {"table_name": "servers", "columns": ["name", "enabled"], "limit": 5}
+            ),
+            await executor.execute_sqlite_tool(
+                "get_table_data", {"table_name": "servers", "columns": ["name", "uri FROM tools --"]}
+            ),
+        )
+
+    projected, rejected = asyncio.run(run_test())
+
+    assert projected["result"]["columns"] == ["name", "enabled"]
+    assert all(len(row) == 2 for row in projected["result"]["rows"])
+    assert rejected["success"] is False
+
+
+def test_get_table_data_columnar_layout(executor):
+    """The columnar layout should transpose rows into one list per column."""
+
+    async def run_test():
+        arguments = {"table_name": "servers", "columns": ["name", "enabled"]}
+        return (
+            await executor.execute_sqlite_tool("get_table_data", arguments),
+            await executor.execute_sqlite_tool("get_table_data", {**arguments, "layout": "columnar"}),
+        )
+
+    by_row, by_column = asyncio.run(run_test())
+
+    assert "rows" not in by_column["result"]
+    assert by_column["result"]["columnar"] == [list(values) for values in zip(*by_row["result"]["rows"])]
+
+
+def test_describe_table_cache_refreshes_after_ddl(executor):
+    """Cached table schemas should be re-read after DDL through query_database."""
+
+    async def run_test():
+        before = await executor.execute_sqlite_tool("describe_table", {"table_name": "memory"})
+        await executor.execute_sqlite_tool("query_database", {"query": "ALTER TABLE memory ADD COLUMN tag TEXT"})
+        after = await executor.execute_sqlite_tool("describe_table", {"table_name": "memory"})
+        return before, after
+
+    before, after = asyncio.run(run_test())
+
+    assert "tag" not in [column[0] for column in before["result"]["columns"]]
+    assert after["result"]["columns"][-1][0] == "tag"
+
+
+def test_unknown_tool_names_are_reported(executor):
+    """Each server should report tool names it has no handler for."""
+
+    async def run_test():
+        return await asyncio.gather(
+            executor.execute_sqlite_tool("drop_everything", {}),
+            executor.execute_filesystem_tool("delete_file", {}),
+            executor.execute_memory_tool("forget_memory", {}),
+        )
+
+    for result in asyncio.run(run_test()):
+        assert result["success"] is False
+        assert result["result"] == f"Unknown tool: {result['tool']}"
+
+
+def test_write_file_round_trips_through_read_file(executor, tmp_path):
+    """write_file should replace a file's contents with the UTF-8 text given."""
+
+    path = tmp_path / "out.txt"
+    path.write_text("a much longer previous body", encoding="utf-8")
+
+    async def run_test():
+        written = await executor.execute_filesystem_tool("write_file", {"path": str(path), "content": "héllo"})
+        read = await executor.execute_filesystem_tool("read_file", {"path": str(path)})
+        return written, read
+
+    written, read = asyncio.run(run_test())
+
+    assert written["success"] is True
+    assert read["result"] == "héllo"
+    assert read["truncated"] is False
+
+
+def test_truncated_reads_do_not_pin_a_snapshot(executor, tmp_path):
+    """A part-read query_database result must not hold back WAL checkpoints."""
+
+    async def run_test():
+        await executor.execute_memory_tool("retrieve_memory", {"key": "missing"})
+        return await executor.execute_sqlite_tool("query_database", {"query": "SELECT name FROM servers", "limit": 1})
+
+    result = asyncio.run(run_test())
+    assert result["result"]["truncated"] is True
+
+    with closing(sqlite3.connect(tmp_path / "mcp.db", isolation_level=None)) as conn:
+        conn.execute("INSERT INTO memory (key, value) VALUES ('k', 'v')")
+        busy, _, _ = conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchone()
+    assert busy == 0
+
+
+def test_describe_table_sees_ddl_from_other_connections(executor, tmp_path):
+    """Schema changes made outside the executor should invalidate cached schemas."""
+
+    before = asyncio.run(executor.execute_sqlite_tool("describe_table", {"table_name": "servers"}))
+
+    with closing(sqlite3.connect(tmp_path / "mcp.db", isolation_level=None)) as conn:
+        conn.execute("ALTER TABLE servers ADD COLUMN description TEXT")
+
+    after = asyncio.run(executor.execute_sqlite_tool("describe_table", {"table_name": "servers"}))
+
+    assert "description" not in [column[0] for column in before["result"]["columns"]]
+    assert after["result"]["columns"][-1][0] == "description"
+
+
+def test_read_file_replaces_undecodable_bytes(executor, tmp_path):
+    """Binary content should be read with replacement characters, not fail."""
+
+    path = tmp_path / "blob.bin"
+    path.write_bytes(b"ok\xff\xfe!")
+
+    result = asyncio.run(executor.execute_filesystem_tool("read_file", {"path": str(path)}))
+
+    assert result["success"] is True
+    assert result["result"] == "ok��!"
+
+
+def test_write_file_replaces_atomically(executor, tmp_path):
+    """write_file should swap in a complete file and keep the target's permissions."""
+
+    path = tmp_path / "config.txt"
+    path.write_text("old", encoding="utf-8")
+    path.chmod(0o640)
+
+    result = asyncio.run(executor.execute_filesystem_tool("write_file", {"path": str(path), "content": "new"}))
+
+    assert result["success"] is True
+    assert path.read_text(encoding="utf-8") == "new"
+    assert path.stat().st_mode & 0o777 == 0o640
+    assert [entry.name for entry in tmp_path.iterdir() if entry.name.startswith("config.txt")] == ["config.txt"]
+
+
+def test_filesystem_tools_stay_inside_fs_root(executor, tmp_path, monkeypatch):
+    """With MCP_FS_ROOT set, paths that resolve outside it should be refused."""
+
+    from app.services import mcp_executor
+
+    root = tmp_path / "sandbox"
+    root.mkdir()
+    (root / "notes.txt").write_text("inside")
+    (tmp_path / "secret.txt").write_text("outside")
+    (root / "escape").symlink_to(tmp_path / "secret.txt")
+    monkeypatch.setattr(mcp_executor, "FS_ROOT", str(root.resolve()))
+
+    async def run_test():
+        return [
+            await executor.execute_filesystem_tool("read_file", {"path": str(root / "notes.txt")}),
+            await executor.execute_filesystem_tool("list_directory", {"path": str(root)}),
+            await executor.execute_filesystem_tool("read_file", {"path": str(root / ".." / "secret.txt")}),
+            await executor.execute_filesystem_tool("read_file", {"path": str(root / "escape")}),
+            await executor.execute_filesystem_tool("write_file", {"path": str(tmp_path / "new.txt"), "content": "x"}),
+        ]
+
+    inside, listing, dotdot, link, write = asyncio.run(run_test())
+
+    assert inside["result"] == "inside"
+    assert listing["success"] is True
+    assert [r["success"] for r in (dotdot, link, write)] == [False, False, False]
+    assert "outside the filesystem root" in dotdot["error"]
+    assert not (tmp_path / "new.txt").exists()
+
+
+def test_execute_tools_from_response_handles_braces_in_string_arguments(executor, tmp_path):
+    """Braces inside JSON strings should not hide a request, and bad payloads should be reported."""
+
+    target = tmp_path / "data.json"
+    response = "\n".join([
+        'TOOL_EXECUTE: {"tool": "write_file", "arguments": {"path": "%s", "content": "{\\"x\\": {\\"y\\": 1}}"}}' % target,
+        'TOOL_EXECUTE: {"tool": "read_file", "arguments": {"path": "%s"}',
+        "TOOL_EXECUTE: list everything",
+    ])
+
+    results = asyncio.run(executor.execute_tools_from_response(response))
+
+    assert [result["success"] for result in results] == [True, False, False]
+    assert target.read_text() == '{"x": {"y": 1}}'
+    assert "Invalid tool request" in results[1]["error"]
+
+
+def test_write_file_through_symlink_replaces_the_target(executor, tmp_path):
+    """Writing via a symlink should update its target and leave the link in place."""
+
+    target = tmp_path / "real.txt"
+    target.write_text("old", encoding="utf-8")
+    link = tmp_path / "link.txt"
+    link.symlink_to(target)
+
+    result = asyncio.run(executor.execute_filesystem_tool("write_file", {"path": str(link), "content": "new"}))
+
+    assert result["success"] is True
+    assert link.is_symlink()
+    assert target.read_text(encoding="utf-8") == "new"
+
+
+@pytest.mark.skipif(not hasattr(os, "geteuid") or os.geteuid() != 0, reason="changing a file's owner needs root")
+def test_write_file_keeps_the_target_owner(executor, tmp_path):
+    """The replacement file should keep the original owner and group."""
+
+    path = tmp_path / "owned.txt"
+    path.write_text("old", encoding="utf-8")
+    os.chown(path, 12345, 12346)
+
+    asyncio.run(executor.execute_filesystem_tool("write_file", {"path": str(path), "content": "new"}))
+
+    assert (path.stat().st_uid, path.stat().st_gid) == (12345, 12346)
+    assert path.read_text(encoding="utf-8") == "new"
+
+
+def test_write_file_falls_back_to_in_place_when_metadata_cannot_be_kept(executor, tmp_path, monkeypatch):
+    """If the new file cannot match the old one's metadata, the old file is rewritten in place."""
+
+    from app.services import mcp_executor
+
+    def refuse(*args):
+        raise PermissionError("cannot copy owner")
+
+    monkeypatch.setattr(mcp_executor, "_copy_file_metadata", refuse)
+    path = tmp_path / "pinned.txt"
+    path.write_text("a much longer old body", encoding="utf-8")
+    inode = path.stat().st_ino
+
+    result = asyncio.run(executor.execute_filesystem_tool("write_file", {"path": str(path), "content": "new"}))
+
+    assert result["success"] is True
+    assert path.stat().st_ino == inode
+    assert path.read_text(encoding="utf-8") == "new"
+    assert [entry.name for entry in tmp_path.iterdir() if entry.name.startswith("pinned")] == ["pinned.txt"]
+
+
+def test_executor_uses_the_configured_database_path(tmp_path, monkeypatch):
+    """Tools should read the database at database.DB_PATH, not a fixed mcp.db."""
+
+    monkeypatch.chdir(tmp_path)
+    db_path = tmp_path / "data" / "hub.db"
+    monkeypatch.setattr(database, "DB_PATH", str(db_path))
+    database.init_db()
+
+    result = asyncio.run(MCPExecutor().execute_sqlite_tool("list_tables", {}))
+
+    assert result["success"] is True
+    assert "tools" in result["result"]["tables"]
+    assert not (tmp_path / "mcp.db").exists()
+
+
+def test_write_batch_survives_statements_that_end_the_transaction(executor, tmp_path):
+    """A batched COMMIT or ROLLBACK should not turn the final commit into an error."""
+
+    asyncio.run(executor.execute_sqlite_tool("query_database", {"query": "CREATE TABLE notes (body TEXT)"}))
+    response = "\n".join([
+        'TOOL_EXECUTE: {"tool": "query_database", "arguments": {"query": "INSERT INTO notes VALUES (\'rolled back\')"}}',
+        'TOOL_EXECUTE: {"tool": "query_database", "arguments": {"query": "ROLLBACK"}}',
+        'TOOL_EXECUTE: {"tool": "query_database", "arguments": {"query": "INSERT INTO notes VALUES (\'kept\')"}}',
+        'TOOL_EXECUTE: {"tool": "query_database", "arguments": {"query": "COMMIT"}}',
+    ])
+
+    results = asyncio.run(executor.execute_tools_from_response(response))
+
+    assert len(results) == 4
+    assert [result["success"] for result in results] == [True, True, True, False]
+    with closing(sqlite3.connect(tmp_path / "mcp.db")) as conn:
+        assert conn.execute("SELECT body FROM notes").fetchall() == [("kept",)]
+
+
+def test_tool_calls_cannot_leave_a_transaction_open(executor, tmp_path):
+    """A BEGIN without COMMIT should be rolled back, not left on the worker's connection."""
+
+    async def run_test():
+        begun = await executor.execute_sqlite_tool("query_database", {"query": "BEGIN IMMEDIATE"})
+        stored = await executor.execute_memory_tool("store_memory", {"key": "after", "value": "begin"})
+        return begun, stored
+
+    begun, stored = asyncio.run(run_test())
+
+    assert begun["success"] is False
+    assert "rolled back" in begun["error"]
+    assert stored["success"] is True
+    with closing(sqlite3.connect(tmp_path / "mcp.db", timeout=0)) as conn:
+        assert conn.execute("SELECT value FROM memory WHERE key = 'after'").fetchall() == [("begin",)]
+        with conn:
+            conn.execute("INSERT INTO memory (key, value) VALUES ('other', 'writer')")
+
+
+def test_write_batch_reports_a_locked_database_per_tool(executor, tmp_path, monkeypatch):
+    """A batch that cannot take the write lock should fail each call, not raise."""
+
+    response = "\n".join([
+        'TOOL_EXECUTE: {"tool": "store_memory", "arguments": {"key": "a", "value": "1"}}',
+        'TOOL_EXECUTE: {"tool": "store_memory", "arguments": {"key": "b", "value": "2"}}',
+    ])
+    # Fail on the lock at once instead of waiting out the busy timeout
+    impatient = sqlite3.connect(tmp_path / "mcp.db", timeout=0, isolation_level=None, check_same_thread=False)
+    monkeypatch.setattr(executor, "_get_connection", lambda: impatient)
+
+    with closing(impatient), closing(sqlite3.connect(tmp_path / "mcp.db")) as blocker:
+        blocker.execute("BEGIN IMMEDIATE")
+        results = asyncio.run(executor.execute_tools_from_response(response))
+
+    assert [result["success"] for result in results] == [False, False]
+    assert all("Could not start transaction" in result["error"] for result in results)
+
+
+def test_execute_tools_from_response_runs_calls_after_a_write_once_it_finishes(executor, tmp_path):
+    """Calls chained on a write should see what it wrote."""
+
+    path = str(tmp_path / "chained.txt").replace("\\", "/")
+    response = "\n".join([
+        f'TOOL_EXECUTE: {{"tool": "write_file", "arguments": {{"path": "{path}", "content": "written"}}}}',
+        f'TOOL_EXECUTE: {{"tool": "read_file", "arguments": {{"path": "{path}"}}}}',
+        'TOOL_EXECUTE: {"tool": "query_database", "arguments": {"query": "CREATE TABLE chained (id INTEGER)"}}',
+        'TOOL_EXECUTE: {"tool": "describe_table", "arguments": {"table_name": "chained"}}',
+        'TOOL_EXECUTE: {"tool": "list_tables", "arguments": {}}',
+    ])
+
+    for _ in range(20):
+        results = asyncio.run(executor.execute_tools_from_response(response))
+        assert [result["success"] for result in results] == [True] * 5
+        assert results[1]["result"] == "written"
+        assert results[3]["result"]["columns"] == (("id", "INTEGER", False, False),)
+        assert "chained" in results[4]["result"]["tables"]
+        asyncio.run(executor.execute_sqlite_tool("query_database", {"query": "DROP TABLE chained"}))
+        os.unlink(path)
+
+
+def test_query_database_reports_statements_without_rows_as_writes(executor, tmp_path):
+    """PRAGMAs and CTEs that return no rows should succeed rather than fail on a missing description."""
+
+    async def run_test():
+        await executor.execute_sqlite_tool("query_database", {"query": "CREATE TABLE notes (body TEXT)"})
+        return (
+            await executor.execute_sqlite_tool("query_database", {"query": "PRAGMA foreign_keys=ON"}),
+            await executor.execute_sqlite_tool(
+                "query_database", {"query": "WITH n(body) AS (VALUES ('cte')) INSERT INTO notes SELECT body FROM n"}
+            ),
+        )
+
+    pragma, insert = asyncio.run(run_test())
+
+    assert pragma["success"] is True
+    assert insert["success"] is True
+    assert insert["result"].startswith("Query executed successfully")
+    with closing(sqlite3.connect(tmp_path / "mcp.db")) as conn:
+        assert conn.execute("SELECT body FROM notes").fetchall() == [("cte",)]
+
+
+def test_parse_tool_requests_skips_malformed_payloads(executor):
+    """Only well-formed requests should be returned, in order."""
+
+    text = "\n".join([
+        'TOOL_EXECUTE: {"tool": "list_tables", "arguments": {}}',
+        'TOOL_EXECUTE: {"tool": }',
+        'TOOL_EXECUTE: {"tool": "describe_table", "arguments": {"table_name": "tools"}}',
+    ])
+
+    assert executor.parse_tool_requests(text) == [
+        ("list_tables", {}),
+        ("describe_table", {"table_name": "tools"}),
+    ]
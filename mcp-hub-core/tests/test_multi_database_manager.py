@@ -98,3 +98,70 @@ def test_search_across_databases_returns_results(tmp_path):
         await manager.close_all_connections()
 
     asyncio.run(run_test())
+
+
+def test_query_all_databases_covers_active_databases_in_order(tmp_path):
+    """Every active database should get a result, keyed in the order they were added."""
+
+    async def run_test():
+        manager = MultiDatabaseManager()
+
+        for name in ("first", "second", "inactive", "third"):
+            await manager.add_database(
+                DatabaseConfig(
+                    name=name,
+                    type=DatabaseType.SQLITE,
+                    host="localhost",
+                    port=0,
+                    database=str(tmp_path / f"{name}.db"),
+                    username="",
+                    password="",
+                    is_active=name != "inactive",
+                )
+            )
+
+        results = await manager.execute_query_all_databases("SELECT 1 AS health_check")
+        schemas = await manager.get_all_schemas()
+
+        assert list(results) == ["first", "second", "third"]
+        assert all(result.success and result.data == [{"health_check": 1}] for result in results.values())
+        assert list(schemas) == ["first", "second", "third"]
+
+        await manager.close_all_connections()
+
+    asyncio.run(run_test())
+
+
+def test_sqlite_schema_lists_every_table_with_its_columns(tmp_path):
+    """The SQLite schema should group each table's columns, names needing quotes included."""
+
+    async def run_test():
+        manager = MultiDatabaseManager()
+        await manager.add_database(
+            DatabaseConfig(
+                name="schema_sqlite",
+                type=DatabaseType.SQLITE,
+                host="localhost",
+                port=0,
+                database=str(tmp_path / "schema.db"),
+                username="",
+                password="",
+            )
+        )
+
+        await manager.execute_query("schema_sqlite", "CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT NOT NULL)")
+        await manager.execute_query("schema_sqlite", 'CREATE TABLE "order lines" (sku TEXT)')
+
+        schema = await manager.get_database_schema("schema_sqlite")
+
+        assert schema["success"] is True
+        assert [table["table_name"] for table in schema["tables"]] == ["items", "order lines"]
+        assert schema["tables"][0]["columns"] == [
+            {"cid": 0, "name": "id", "type": "INTEGER", "notnull": 0, "dflt_value": None, "pk": 1},
+            {"cid": 1, "name": "name", "type": "TEXT", "notnull": 1, "dflt_value": None, "pk": 0},
+        ]
+        assert [column["name"] for column in schema["tables"][1]["columns"]] == ["sku"]
+
+        await manager.close_all_connections()
+
+    asyncio.run(run_test())
@@ -1117,9 +1117,9 @@ function Resources() {
                             </Table>
                           </TableContainer>
                           
-                          {queryResult.result.row_count > 100 && (
+                          {queryResult.result.truncated && (
                             <Typography variant="body2" color="text.secondary" sx={{ mt: 1 }}>
-                              Showing first 100 rows of {queryResult.result.row_count} total rows
+                              Showing first {queryResult.result.row_count} rows; the query matched more rows
                             </Typography>
                           )}
                         </Box>
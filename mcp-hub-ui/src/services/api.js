@@ -9,6 +9,19 @@ const api = axios.create({
   timeout: 30000, // 30 seconds
 });
 
+// Identifies this browser tab's chat session; the server keeps chat
+// history per session
+const getSessionId = () => {
+  let sessionId = sessionStorage.getItem('chat_session_id');
+  if (!sessionId) {
+    sessionId = window.crypto?.randomUUID
+      ? window.crypto.randomUUID()
+      : `${Date.now().toString(36)}-${Math.random().toString(36).slice(2)}`;
+    sessionStorage.setItem('chat_session_id', sessionId);
+  }
+  return sessionId;
+};
+
 // Request interceptor
 api.interceptors.request.use(
   (config) => {
@@ -17,6 +30,7 @@ api.interceptors.request.use(
     if (token) {
       config.headers.Authorization = `Bearer ${token}`;
     }
+    config.headers['X-Session-ID'] = getSessionId();
     return config;
   },
   (error) => {